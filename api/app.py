@@ -4,7 +4,15 @@ from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 from dotenv import load_dotenv
 from fastapi.responses import RedirectResponse
+from utils.action_scheduler import actions
 from utils.auth import require_auth
+from utils.bans import ban_index
+from utils.channels import channel_resolver
+from utils.config import config
+from utils.expiry import expiry
+from utils.modlog import modlog
+from utils.permissions import perm_cache_stats
+from utils.storage import get_store
 
 load_dotenv()
 
@@ -66,10 +74,27 @@ def create_api(bot):
                 "bot": {
                     "status": "ONLINE" if bot.is_ready() else "OFFLINE",
                     "latency": round(bot.latency * 1000)
-                }
+                },
+                "cache": {
+                    **get_store().cache_stats(),
+                    "permLevels": perm_cache_stats(),
+                    "logChannels": channel_resolver.stats()
+                },
+                "modlog": modlog.stats(),
+                "actions": actions.stats(),
+                "expiry": expiry.stats(),
+                "bans": ban_index.stats()
             }
         }
 
+    @app.get("/api/bans/{user_id}", dependencies=[Depends(require_auth)])
+    async def ban_status(user_id: int, guild_id: int | None = None):
+        # Ohne ?guild_id= der konfigurierte Server (bot.guilds hat keine feste Reihenfolge)
+        guild_id = guild_id or config.guild_id
+        if not ban_index.is_ready(guild_id):
+            raise HTTPException(status_code=503, detail="Bann-Index nicht bereit")
+        return {"userId": str(user_id), "guildId": str(guild_id), "banned": ban_index.is_banned(guild_id, user_id)}
+
     @app.get("/api/users", dependencies=[Depends(require_auth)])
     async def users():
         return {"users": []}
@@ -5,15 +5,17 @@ from discord.ext import commands
 from utils.decorators import require_perm
 from utils.hardening import can_moderate
 from utils.logger import logger
+from utils.async_db import check_user_stats
+from utils.config import ConfigError, config
 
-allowed_cogs = {"admin", "moderation", "fun", "utility", "music"}
+allowed_cogs = {"admin", "moderation", "fun", "utility", "music", "maintenance", "events", "raid"}
 
 class Admin(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
     @app_commands.command(name="reload", description="Reload a cog")
-    @app_commands.describe(cog="Name des Cogs (z.B. moderation, admin)")
+    @app_commands.describe(cog="Name des Cogs (z.B. moderation, admin) oder 'config' für config.yaml")
     @require_perm("reload")
     async def reload(self, interaction: discord.Interaction, cog: str):
         await interaction.response.defer(ephemeral=True)
@@ -32,6 +34,21 @@ class Admin(commands.Cog):
             await interaction.followup.send(f"❌ {reason}", ephemeral=True)
             return
 
+        # Sonderfall: config.yaml neu einlesen (kein Cog)
+        if cog == "config":
+            try:
+                changed = config.reload()
+            except ConfigError as e:
+                await interaction.followup.send(f"{e}\n\nAlte Config bleibt aktiv.", ephemeral=True)
+                logger.error(f"RELOAD FAILED | config.yaml\n{e}")
+                return
+            await interaction.followup.send(
+                "✅ `config.yaml` wurde neu geladen." if changed else "ℹ️ `config.yaml` unverändert.",
+                ephemeral=True
+            )
+            logger.info(f"RELOAD | {interaction.user} -> config.yaml")
+            return
+
         # Allowed list of cogs
         if cog not in allowed_cogs:
             await interaction.followup.send(
@@ -72,6 +89,27 @@ class Admin(commands.Cog):
             )
             logger.exception(f"RELOAD FAILED | {ext}")
 
+    @app_commands.command(name="rebuild_stats", description="Prüft die Warn-Statistiken und repariert Abweichungen")
+    @app_commands.describe(repair="Bei Abweichungen neu aufbauen (Standard: ja)")
+    @require_perm("rebuild_stats")
+    async def rebuild_stats(self, interaction: discord.Interaction, repair: bool = True):
+        await interaction.response.defer(ephemeral=True)
+
+        result = await check_user_stats(repair)
+
+        if not result["drift"]:
+            await interaction.followup.send("✅ user_stats ist konsistent.", ephemeral=True)
+            return
+
+        logger.warning(
+            f"USER_STATS DRIFT | {interaction.user} | {result['drift']} User | repariert={result['repaired']}"
+        )
+        if result["repaired"]:
+            msg = f"🔧 {result['drift']} abweichende User gefunden - user_stats wurde neu aufgebaut."
+        else:
+            msg = f"⚠️ {result['drift']} abweichende User gefunden (nicht repariert)."
+        await interaction.followup.send(msg, ephemeral=True)
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Admin(bot))
@@ -0,0 +1,88 @@
+import discord
+from discord.ext import commands
+
+from utils.async_db import clear_ban, mark_banned
+from utils.bans import ban_index
+from utils.channels import channel_resolver
+from utils.permissions import clear_perm_cache, invalidate_member
+
+
+class Events(commands.Cog):
+    """Gateway-Events, die Caches aktuell halten (keine Slash Commands)."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    # -----------------------------
+    # PERM-LEVEL CACHE
+    # -----------------------------
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.roles != after.roles:
+            invalidate_member(after.guild.id, after.id)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        invalidate_member(member.guild.id, member.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        # Rechte einer Rolle geändert (z.B. administrator) -> betrifft alle Träger
+        if before.permissions != after.permissions:
+            clear_perm_cache(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        clear_perm_cache(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        # Neuer Owner -> guild_permissions (administrator) ändern sich ohne Rollen-Event
+        if before.owner_id != after.owner_id:
+            clear_perm_cache(after.id)
+
+    # -----------------------------
+    # LOG-CHANNEL CACHE
+    # -----------------------------
+    @commands.Cog.listener()
+    async def on_ready(self):
+        await channel_resolver.warm(self.bot)
+        await ban_index.warm(self.bot)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        channel_resolver.update(after)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        channel_resolver.remove(channel.id)
+
+    # -----------------------------
+    # BANN-INDEX + DB
+    # -----------------------------
+    # Banns/Entbannungen direkt in Discord (ohne Bot) auch in die DB übernehmen,
+    # sonst setzt der Gilden-Sync einen manuell aufgehobenen Bann wieder.
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild: discord.Guild, user: discord.User | discord.Member):
+        ban_index.add(guild.id, user.id)
+        await mark_banned(guild.id, user.id, "Bann in Discord")
+
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild: discord.Guild, user: discord.User):
+        ban_index.remove(guild.id, user.id)
+        await clear_ban(guild.id, user.id)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        try:
+            await ban_index.build(guild)
+        except discord.HTTPException:
+            pass  # ohne Bann-Rechte bleibt die Gilde unindiziert
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        ban_index.drop(guild.id)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Events(bot))
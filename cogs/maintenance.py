@@ -0,0 +1,138 @@
+from datetime import time, timezone
+
+from discord.ext import commands, tasks
+
+from utils.async_db import archive_old_warnings
+from utils.bans import ban_index
+from utils.config import ConfigError, config
+from utils.expiry import expiry
+from utils.logger import logger, log_to_channel
+from utils.sync import sync_guild
+
+
+class Maintenance(commands.Cog):
+    """Hintergrund-Jobs (keine Slash Commands)."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        self.retention.start()
+        self.config_watch.start()
+        self.nightly_sync.start()
+        self.ban_drift.start()
+        expiry.start(self.bot)
+
+    async def cog_unload(self):
+        self.retention.cancel()
+        self.config_watch.cancel()
+        self.nightly_sync.cancel()
+        self.ban_drift.cancel()
+        await expiry.stop()
+
+    # -----------------------------
+    # CONFIG HOT-RELOAD (Polling)
+    # -----------------------------
+    @tasks.loop(seconds=5)
+    async def config_watch(self):
+        # stat() ist billig; gelesen + gehasht wird nur bei geänderter mtime.
+        # Jeder Fehler wird hier abgefangen - eine Exception beendet den Loop
+        # sonst endgültig (z.B. OSError, wenn der Editor beim Speichern umbenennt)
+        try:
+            if not config.changed():
+                return
+            config.reload()
+        except ConfigError as e:
+            logger.error(f"CONFIG | Reload abgelehnt, alte Config bleibt aktiv\n{e}")
+        except Exception as e:
+            logger.error(f"CONFIG | Reload fehlgeschlagen, nächster Versuch in 5s | {type(e).__name__}: {e}")
+
+    @config_watch.error
+    async def config_watch_error(self, error: BaseException):
+        logger.error(f"CONFIG WATCH FAILED | {type(error).__name__}: {error}")
+
+    # -----------------------------
+    # RETENTION (täglich)
+    # -----------------------------
+    @tasks.loop(hours=24)
+    async def retention(self):
+        mod_cfg = config.moderation
+        max_age_days = int(mod_cfg.get("warn_retention_days", 0))
+        if max_age_days <= 0:
+            return
+
+        batch_size = int(mod_cfg.get("retention_batch_size", 500))
+        try:
+            archived = await archive_old_warnings(max_age_days, batch_size)
+        except Exception as e:
+            # z.B. sqlite3-Fehler - morgen erneut, statt den Loop zu beenden
+            logger.error(f"RETENTION | Archivieren fehlgeschlagen | {type(e).__name__}: {e}")
+            return
+        if archived:
+            logger.info(f"RETENTION | {archived} Verwarnung(en) älter als {max_age_days} Tage archiviert")
+
+    @retention.error
+    async def retention_error(self, error: BaseException):
+        logger.error(f"RETENTION FAILED | {type(error).__name__}: {error}")
+
+    # -----------------------------
+    # GILDEN-SYNC (nächtlich)
+    # -----------------------------
+    @tasks.loop(time=time(hour=4, tzinfo=timezone.utc))
+    async def nightly_sync(self):
+        if not config.moderation.get("nightly_sync", False):
+            return
+
+        await self.bot.wait_until_ready()
+        channel_id = int(config.log_channels.get("moderation", 0))
+        for guild in self.bot.guilds:
+            # Unbeaufsichtigt: Banns nur in der DB melden, nicht erneut setzen
+            try:
+                report = await sync_guild(guild, reapply_bans=False)
+            except Exception as e:
+                # Eine Gilde (z.B. fehlende Bann-Rechte) darf die übrigen nicht aufhalten
+                logger.error(f"NIGHTLY SYNC | {guild.id} fehlgeschlagen | {type(e).__name__}: {e}")
+                continue
+            logger.info(
+                f"NIGHTLY SYNC | {guild.id} | members={report.members} "
+                f"fixes={len(report.applied)} failed={len(report.failed)} db_only={len(report.db_only)}"
+            )
+            # Nur melden, wenn es etwas zu korrigieren oder zu prüfen gab
+            if channel_id and (report.applied or report.failed or report.db_only or report.notes):
+                embed = report.build_embed()
+                await log_to_channel(self.bot, channel_id, embed.title, embed=embed)
+
+    @nightly_sync.error
+    async def nightly_sync_error(self, error: BaseException):
+        logger.error(f"NIGHTLY SYNC FAILED | {type(error).__name__}: {error}")
+
+    # -----------------------------
+    # BANN-DRIFT (Index <-> DB)
+    # -----------------------------
+    @tasks.loop(minutes=10)
+    async def ban_drift(self):
+        # Nur Set-Vergleich gegen eine DB-Query - korrigiert wird im (nächtlichen) Gilden-Sync
+        for guild in self.bot.guilds:
+            try:
+                drift = await ban_index.check_drift(guild.id)
+            except Exception as e:
+                # Eine Gilde / ein DB-Fehler darf den Loop nicht beenden
+                logger.error(f"BAN DRIFT | {guild.id} | {type(e).__name__}: {e}")
+                continue
+            if drift and (drift["db_only"] or drift["discord_only"]):
+                logger.warning(
+                    f"BAN DRIFT | {guild.id} | nur DB: {len(drift['db_only'])} "
+                    f"nur Discord: {len(drift['discord_only'])}"
+                )
+
+    @ban_drift.before_loop
+    async def before_ban_drift(self):
+        await self.bot.wait_until_ready()
+
+    @ban_drift.error
+    async def ban_drift_error(self, error: BaseException):
+        logger.error(f"BAN DRIFT FAILED | {type(error).__name__}: {error}")
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Maintenance(bot))
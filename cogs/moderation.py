@@ -1,3 +1,5 @@
+import asyncio
+import time
 import discord
 
 from datetime import timedelta
@@ -7,22 +9,40 @@ from discord.utils import utcnow
 from utils.hardening import can_moderate
 from utils.config import config
 from utils.hardlock import hardlock_check, hardlock_log_line
-from utils.logger import logger, log_to_channel
-from utils.sync import sync_user_state
+from utils.logger import logger, log_to_channel, action_extra
+from utils.sync import sync_guild, sync_user_state
 from utils.moderation_utils import can_auto_action, handle_auto_actions
 from utils.decorators import require_perm
-from utils.warnings_db import (
+from utils.bans import ban_index
+from utils.expiry import BAN, TIMEOUT, expiry
+from utils.async_db import (
     add_warning, count_warnings, delete_warnings as db_delete_warnings, get_warning_by_id,
-    delete_warning_by_id, get_last_auto_action, get_last_warning_id, save_ban,save_timeout, clear_ban, clear_timeout, get_user_status)
+    delete_warning_by_id, get_last_warning_id, save_ban,save_timeout, clear_ban, clear_timeout, get_user_snapshot,
+    count_archived_warnings)
+from utils.views import WarningHistoryView
 from utils.moderation_actions import (safe_timeout, safe_untimeout, safe_kick, safe_ban, safe_unban, get_auto_action_preview)
 
+MAX_BAN_MINUTES = 365 * 24 * 60  # temporäre Banns: max. 1 Jahr
 
-mod_cfg = config.moderation
 
-timeout_warn = mod_cfg.get("warn_timeout_threshold", 2)
-timeout_duration = mod_cfg.get("warn_timeout_duration", 300)
-kick_warn = mod_cfg.get("warn_kick_threshold", 3)
-ban_warn = mod_cfg.get("warn_ban_threshold", 5)
+async def _timed(stages: dict, name: str, coro):
+    """Dauer einer Pipeline-Stufe in stages[name] (ms) festhalten."""
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        stages[name] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def warn_thresholds() -> dict:
+    """Schwellen aus dem aktuellen config.yaml-Snapshot (Hot-Reload ohne Neustart)."""
+    mod_cfg = config.moderation
+    return {
+        "timeout_warn": mod_cfg.get("warn_timeout_threshold", 2),
+        "kick_warn": mod_cfg.get("warn_kick_threshold", 3),
+        "ban_warn": mod_cfg.get("warn_ban_threshold", 5),
+        "timeout_duration": mod_cfg.get("warn_timeout_duration", 300),
+    }
 
 
 
@@ -55,7 +75,8 @@ class Moderation(commands.Cog):
             )
             return
         until = utcnow() + timedelta(seconds=duration)
-        save_timeout(interaction.guild_id, user.id, until, reason)
+        await save_timeout(interaction.guild_id, user.id, until, reason)
+        expiry.schedule(TIMEOUT, interaction.guild_id, user.id, until)
         # Loggen   
         channel_id = int(config.log_channels.get("moderation", 0)) # 0 = kein Logging - durch config.yaml wird geguckt obs nen log_channel gibt
         if channel_id:
@@ -70,7 +91,8 @@ class Moderation(commands.Cog):
                 discord.Color.gold(),
                 )
         logger.info(
-        f"TIMEOUT | {interaction.user} -> {user} | {duration}s | {reason}"
+        f"TIMEOUT | {interaction.user} -> {user} | {duration}s | {reason}",
+        extra=action_extra("timeout", interaction, user)
         )
 
         await interaction.followup.send(
@@ -103,7 +125,7 @@ class Moderation(commands.Cog):
                 ephemeral=True
             )
             return
-        clear_timeout(interaction.guild.id, user.id)
+        await clear_timeout(interaction.guild.id, user.id)
         # Loggen
         channel_id = int(config.log_channels.get("moderation", 0))
         if channel_id:
@@ -115,7 +137,7 @@ class Moderation(commands.Cog):
                     f"**User:** {user.mention} (ID: {user.id})\n",
                     discord.Color.green(),
                 )
-        logger.info(f"UNTIMEOUT | {interaction.user} -> {user}")
+        logger.info(f"UNTIMEOUT | {interaction.user} -> {user}", extra=action_extra("untimeout", interaction, user))
         await interaction.followup.send(
             f"✅ Timeout von {user.mention} wurde entfernt.\n"
             f"**Grund:** {reason}",
@@ -143,64 +165,112 @@ class Moderation(commands.Cog):
                 ephemeral=True
             )
             return
-        # DM an User (optional, aber Standard)
+        # --- Pipeline ---
+        # Erst die Verwarnung committen - DM nur für gespeicherte Verwarnungen.
+        # Danach laufen DM, Antwort und Modlog parallel. Auto-Aktionen erst
+        # nach der DM (nach Kick/Bann erreicht den User keine DM mehr).
+        stages: dict[str, float] = {}
+
+        try:
+            warning_id, total_warnings = await _timed(
+                stages, "db", self._store_warning(interaction, user, reason)
+            )
+        except Exception as e:
+            logger.error(f"WARN FAILED | {interaction.user} -> {user} | DB: {type(e).__name__}: {e}")
+            await interaction.followup.send(
+                f"❌ Verwarnung konnte nicht gespeichert werden ({type(e).__name__}).",
+                ephemeral=True
+            )
+            return
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(_timed(stages, "dm", self._send_warn_dm(interaction, user, reason)))
+
+                await _timed(stages, "ack", interaction.followup.send(
+                    f"✅ {user.mention} wurde verwarnt. ({total_warnings} Verwarnung(en))",
+                    ephemeral=True
+                ))
+
+                # Modlog Embed (wird nur eingereiht)
+                embed = discord.Embed(
+                    title="⚠️ Verwarnung",
+                    color=discord.Color.orange(),
+                    timestamp=utcnow()
+                )
+                embed.add_field(name="User", value=f"{user} ({user.id})", inline=False)
+                embed.add_field(name="Anzahl der Verwarnungen", value=str(total_warnings), inline=False)
+                embed.add_field(name="Moderator", value=f"{interaction.user}", inline=False)
+                embed.add_field(name="Grund", value=reason, inline=False)
+
+                channel_id = int(config.log_channels.get("moderation", 0))
+                if channel_id:
+                    await log_to_channel(self.bot, channel_id, "⚠️ User verwarnt", embed=embed)
+        except* Exception as group:
+            # Verwarnung ist gespeichert - echte Ursache loggen statt ExceptionGroup
+            # an den globalen Handler durchzureichen
+            causes = "; ".join(f"{type(e).__name__}: {e}" for e in group.exceptions)
+            logger.error(f"WARN | {interaction.user} -> {user} | Warnung #{warning_id} gespeichert, aber: {causes}")
+            try:
+                await interaction.followup.send(
+                    f"⚠️ Verwarnung gespeichert ({total_warnings} Verwarnung(en)), aber: {causes}"[:2000],
+                    ephemeral=True
+                )
+            except discord.HTTPException:
+                pass
+
+        # --- Automatische Maßnahmen ---
+        if can_auto_action(interaction, user):
+            action_taken = await _timed(stages, "auto_action", handle_auto_actions(
+                bot=self.bot,
+                interaction=interaction,
+                user=user,
+                total_warnings=total_warnings,
+                warning_id=warning_id,
+                **warn_thresholds()
+            ))
+            if action_taken:
+                await interaction.followup.send(
+                    "⚙️ Automatische Maßnahme ausgelöst (siehe Modlog).",
+                    ephemeral=True
+                )
+
+        extra = action_extra("warn", interaction, user)
+        extra["stages"] = stages
+        logger.info(
+            f"WARN | {interaction.user} -> {user} | {reason} | "
+            + " ".join(f"{name}={ms}ms" for name, ms in stages.items()),
+            extra=extra
+        )
+
+    async def _send_warn_dm(self, interaction: discord.Interaction, user: discord.Member, reason: str) -> bool:
+        """DM an User (optional, aber Standard). Wirft nie - sonst bricht die TaskGroup ab."""
         try:
             await user.send(
                 f"⚠️ **Verwarnung auf {interaction.guild.name}**\n"
                 f"**Grund:** {reason}\n"
                 f"**Moderator:** {interaction.user}"
             )
-        except discord.Forbidden:
-            pass  # DMs aus → egal, Log zählt
+            return True
+        except discord.HTTPException:
+            return False  # DMs aus → egal, Log zählt
 
-        # Warnung in DB speichern
-        warning_id = add_warning(
+    async def _store_warning(self, interaction: discord.Interaction, user: discord.Member, reason: str) -> tuple[int, int]:
+        """Warnung speichern (Future erst nach COMMIT erfüllt) + neue Anzahl."""
+        warning_id = await add_warning(
             guild_id=interaction.guild.id,
             user_id=user.id,
             moderator_id=interaction.user.id,
             reason=reason,
         )
-        # Anzahl der Verwarnungen holen
-        total_warnings = count_warnings(
+        # Anzahl der Verwarnungen holen (Cache wurde vom Insert schon angepasst)
+        total_warnings = await count_warnings(
             guild_id=interaction.guild.id,
             user_id=user.id
         )
+        return warning_id, total_warnings
 
-        # --- Automatische Maßnahmen ---
-        if can_auto_action(interaction, user):
-            action_taken = await handle_auto_actions(
-                bot=self.bot,
-                interaction=interaction,
-                user=user,
-                total_warnings=total_warnings,
-                warning_id=warning_id,
-                timeout_warn=timeout_warn,
-                kick_warn=kick_warn,
-                ban_warn=ban_warn,
-                timeout_duration=timeout_duration
-            )
-            if action_taken:
-                return  # Auto-Aktion 
-        # Modlog Embed
-        embed = discord.Embed(
-            title="⚠️ Verwarnung",
-            color=discord.Color.orange(),
-            timestamp=utcnow()
-        )
-        embed.add_field(name="User", value=f"{user} ({user.id})", inline=False)
-        embed.add_field(name="Anzahl der Verwarnungen", value=str(total_warnings), inline=False)
-        embed.add_field(name="Moderator", value=f"{interaction.user}", inline=False)
-        embed.add_field(name="Grund", value=reason, inline=False)
-
-        channel_id = int(config.log_channels.get("moderation", 0))
-        if channel_id:
-            await log_to_channel(self.bot,channel_id,"⚠️ User verwarnt",embed=embed)
-        await interaction.followup.send(
-        f"✅ {user.mention} wurde verwarnt.",
-        ephemeral=True
-    )
-
-    @app_commands.command(name="warnings", description="Zeigt die Anzahl der Verwarnungen eines Users an")
+    @app_commands.command(name="warnings", description="Zeigt die Verwarnungen eines Users an")
     @app_commands.describe(
         user="User, dessen Verwarnungen angezeigt werden sollen"
     )  
@@ -220,13 +290,24 @@ class Moderation(commands.Cog):
             return
         
         # Anzahl der Verwarnungen holen
-        total_warnings = count_warnings(
+        total_warnings = await count_warnings(
             guild_id=interaction.guild.id,
             user_id=user.id
         )
 
-        await interaction.followup.send(
-            f"ℹ️ {user.mention} hat {total_warnings} Verwarnung(en).",
+        if total_warnings == 0:
+            await interaction.followup.send(
+                f"ℹ️ {user.mention} hat keine Verwarnungen.",
+                ephemeral=True
+            )
+            return
+
+        # Historie seitenweise (Buttons laden die nächste Seite nach)
+        view = WarningHistoryView(interaction.user.id, interaction.guild.id, user, total_warnings)
+        await view.load()
+        view.message = await interaction.followup.send(
+            embed=view.build_embed(),
+            view=view,
             ephemeral=True
         )
 
@@ -257,7 +338,7 @@ class Moderation(commands.Cog):
             )
             return        
         # Anzahl VOR dem Löschen holen
-        total_warnings = count_warnings(
+        total_warnings = await count_warnings(
             guild_id=interaction.guild.id,
             user_id=user.id
             )
@@ -270,7 +351,7 @@ class Moderation(commands.Cog):
             )
             return
         # Verwarnungen löschen
-        db_delete_warnings(
+        await db_delete_warnings(
             guild_id=interaction.guild.id,
             user_id=user.id
         )
@@ -286,9 +367,7 @@ class Moderation(commands.Cog):
 
         channel_id = int(config.log_channels.get("moderation", 0))
         if channel_id:
-            modlog_channel = self.bot.get_channel(channel_id)
-            if modlog_channel:
-                await modlog_channel.send(embed=embed)
+            await log_to_channel(self.bot, channel_id, embed.title, embed=embed)
         # EINMAL antworten
         await interaction.followup.send(
             f"✅ Alle Verwarnungen von {user.mention} wurden gelöscht.",
@@ -315,7 +394,7 @@ class Moderation(commands.Cog):
             return
 
         # Letzte Verwarnung ID holen
-        warn_id = get_last_warning_id(
+        warn_id = await get_last_warning_id(
             guild_id=interaction.guild.id,
             user_id=user.id
         )
@@ -325,7 +404,7 @@ class Moderation(commands.Cog):
                 ephemeral=True
             )
             return
-        auto_action_type = get_warning_by_id(warn_id)
+        auto_action_type = await get_warning_by_id(warn_id)
         if auto_action_type:
             await interaction.followup.send(
                 "❌ Diese Verwarnung hat eine automatische Maßnahme ausgelöst "
@@ -334,7 +413,7 @@ class Moderation(commands.Cog):
             )
             return
         # Letzte Verwarnung löschen
-        delete_warning_by_id(warn_id)
+        await delete_warning_by_id(warn_id)
 
         embed = discord.Embed(
             title="🧹 Letzte Verwarnung gelöscht",
@@ -346,9 +425,7 @@ class Moderation(commands.Cog):
 
         channel_id = int(config.log_channels.get("moderation", 0))
         if channel_id:
-            modlog_channel = self.bot.get_channel(channel_id)
-            if modlog_channel:
-                await modlog_channel.send(embed=embed)
+            await log_to_channel(self.bot, channel_id, embed.title, embed=embed)
 
         await interaction.followup.send(
             f"✅ Die letzte Verwarnung von {user.mention} wurde gelöscht.",
@@ -400,7 +477,7 @@ class Moderation(commands.Cog):
                 f"**Grund:** {reason}\n",
                 discord.Color.orange(),
             )
-        logger.info(f"KICK | {interaction.user} -> {user} | {reason}")
+        logger.info(f"KICK | {interaction.user} -> {user} | {reason}", extra=action_extra("kick", interaction, user))
 
         await interaction.followup.send(
             f"✅ {user.mention} wurde gekickt. Grund: {reason}",
@@ -411,7 +488,8 @@ class Moderation(commands.Cog):
     @app_commands.describe(
         user="User, der gebannt werden soll",
         reason="Grund für den Bann",
-        delete_days="Anzahl der Tage, für die Nachrichten gelöscht werden sollen (0-7)"
+        delete_days="Anzahl der Tage, für die Nachrichten gelöscht werden sollen (0-7)",
+        duration="Dauer in Minuten für einen temporären Bann (leer = permanent)"
     )
     @require_perm("ban")
     async def ban(
@@ -419,7 +497,8 @@ class Moderation(commands.Cog):
         interaction: discord.Interaction,
         user: discord.Member,
         reason: str = "Kein Grund angegeben",
-        delete_days: int = 0
+        delete_days: int = 0,
+        duration: app_commands.Range[int, 1, MAX_BAN_MINUTES] | None = None
     ):
         await interaction.response.defer(ephemeral=True)
 
@@ -448,7 +527,12 @@ class Moderation(commands.Cog):
                 ephemeral=True
             )
             return
-        save_ban(interaction.guild.id, user.id, reason)
+        # Temporär: Unban-Zeitpunkt in der DB, der Expiry-Scheduler hebt ihn auf
+        until = utcnow() + timedelta(minutes=duration) if duration else None
+        await save_ban(interaction.guild.id, user.id, reason, until)
+        if until:
+            expiry.schedule(BAN, interaction.guild.id, user.id, until)
+        period = f"bis {discord.utils.format_dt(until)}" if until else "permanent"
         # Loggen
         channel_id = int(config.log_channels.get("moderation", 0))
         if channel_id:
@@ -458,13 +542,14 @@ class Moderation(commands.Cog):
                 f"🔨 User gebannt",
                 f"**Moderator:** {interaction.user} (ID: {interaction.user.id})\n"
                 f"**User:** {user.mention} (ID: {user.id})\n"
-                f"**Grund:** {reason}\n",
+                f"**Grund:** {reason}\n"
+                f"**Dauer:** {period}\n",
                 discord.Color.dark_red(),
             )
-        logger.info(f"BAN | {interaction.user} -> {user} | {reason}")
+        logger.info(f"BAN | {interaction.user} -> {user} | {period} | {reason}", extra=action_extra("ban", interaction, user))
 
         await interaction.followup.send(
-            f"✅ {user.mention} wurde gebannt. Grund: {reason}",
+            f"✅ {user.mention} wurde gebannt ({period}). Grund: {reason}",
             ephemeral=True
         )
     @app_commands.command(name="unban", description="Entbannt einen User")
@@ -490,6 +575,14 @@ class Moderation(commands.Cog):
             )
             return
         user = discord.Object(id=uid)
+        # Bann-Index: nicht gebannt -> kein REST-Call, nur DB-Flag bereinigen
+        if ban_index.is_banned(interaction.guild.id, uid) is False:
+            await clear_ban(interaction.guild.id, uid)
+            await interaction.followup.send(
+                "❌ User ist auf diesem Server nicht gebannt.",
+                ephemeral=True
+            )
+            return
         #--- Action Helpers ---
         ok, error = await safe_unban(
             interaction.guild, user, reason=reason
@@ -500,7 +593,7 @@ class Moderation(commands.Cog):
                 ephemeral=True
             )
             return
-        clear_ban(interaction.guild.id, user.id)
+        await clear_ban(interaction.guild.id, user.id)
         logger.warning(f"CLEAR_BAN CALLED for {user.id}")
         # Loggen
         channel_id = int(config.log_channels.get("moderation", 0))
@@ -514,25 +607,27 @@ class Moderation(commands.Cog):
                 f"**Grund:** {reason}\n",
                 discord.Color.green(),
             )
-        logger.info(f"UNBAN | {interaction.user} -> {uid} | {reason}")
+        logger.info(f"UNBAN | {interaction.user} -> {uid} | {reason}", extra=action_extra("unban", interaction, uid))
         await interaction.followup.send(
             f"✅ User mit ID `{uid}` wurde entbannt. Grund: {reason}",
             ephemeral=True
         )
     @app_commands.command(name="userinfo", description="Zeigt Informationen an")
     @app_commands.describe(
-        user="User, über den Informationen angezeigt werden sollen"
+        user="User, über den Informationen angezeigt werden sollen",
+        archived="Auch archivierte (alte) Verwarnungen mitzählen"
     )
     @require_perm("userinfo")
     async def userinfo(
         self,
         interaction: discord.Interaction,
-        user: discord.Member
+        user: discord.Member,
+        archived: bool = False
     ):
         await interaction.response.defer(ephemeral=True)
 
-        #DB status
-        status = get_user_status(interaction.guild.id, user.id)
+        #DB status (Warns, letzte Auto-Aktion, Timeout, Bann - eine Query)
+        status = await get_user_snapshot(interaction.guild.id, user.id)
 
         # --- Mismatch Detection ---
         db_timeout_active = status["timeout_until"] is not None
@@ -544,7 +639,11 @@ class Moderation(commands.Cog):
         if discord_timeout_active and not db_timeout_active:
             details.append("• Timeout bei Discord aktiv, aber nicht in DB")
         if status["active_ban"]:
-            details.append("• Bann in DB aktiv")
+            # Bann-Index statt fetch_ban: ein Member auf dem Server ist bei Discord nie gebannt
+            if ban_index.is_banned(interaction.guild.id, user.id) is False:
+                details.append("• Bann in DB aktiv, aber nicht bei Discord")
+            else:
+                details.append("• Bann in DB aktiv")
 
         # --- Embed-Farbe abhängig vom Status ---
         if status["active_ban"]:
@@ -559,16 +658,18 @@ class Moderation(commands.Cog):
         joined_at = discord.utils.format_dt(user.joined_at, style="F") if user.joined_at else "Unbekannt"
 
         #warnings count
-        total_warnings = count_warnings(
-            guild_id=interaction.guild.id,
-            user_id=user.id
-        )
+        total_warnings = status["warns"]
         auto_action_preview = get_auto_action_preview(total_warnings)
-
-        last_action = get_last_auto_action(
-            guild_id=interaction.guild.id,
-            user_id=user.id
-        ) or "Keine"
+        warn_line = f"**Verwarnungen:** {total_warnings}"
+        if archived:
+            archived_warnings = await count_archived_warnings(interaction.guild.id, user.id)
+            warn_line += f" (+ {archived_warnings} archiviert)"
+
+        last_auto = status["last_auto_action"]
+        last_action = (
+            f"{last_auto['type']} ({discord.utils.format_dt(last_auto['at'], style='R')})"
+            if last_auto else "Keine"
+        )
 
         #timeout info
         discord_timeout = user.is_timed_out()
@@ -596,7 +697,7 @@ class Moderation(commands.Cog):
         embed.add_field(
             name="📜 Moderation (Historie)",
             value=(
-                f"**Verwarnungen:** {total_warnings}\n"
+                f"{warn_line}\n"
                 f"**Letzte Auto-Aktion:** {last_action}"
             ),
             inline=False
@@ -759,5 +860,30 @@ class Moderation(commands.Cog):
         ephemeral=True
         )
 
+    @app_commands.command(name="sync_guild", description="Gleicht DB und Discord für die ganze Gilde ab")
+    @app_commands.describe(dry_run="Nur anzeigen, was korrigiert würde")
+    @require_perm("sync_guild")
+    async def sync_guild_cmd(
+        self,
+        interaction: discord.Interaction,
+        dry_run: bool = False
+    ):
+        await interaction.response.defer(ephemeral=True)
+
+        report = await sync_guild(interaction.guild, dry_run=dry_run)
+        embed = report.build_embed()
+        embed.add_field(name="Moderator", value=f"{interaction.user} ({interaction.user.id})", inline=False)
+
+        # Dry-Run ändert nichts -> kein Modlog
+        channel_id = int(config.log_channels.get("moderation", 0))
+        if channel_id and not dry_run:
+            await log_to_channel(self.bot, channel_id, embed.title, embed=embed)
+        logger.warning(
+            f"SYNC_GUILD | {interaction.user} | dry_run={dry_run} members={report.members} "
+            f"fixes={len(report.applied)} failed={len(report.failed)}",
+            extra=action_extra("sync_guild", interaction)
+        )
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
 async def setup(bot: commands.Bot):    
     await bot.add_cog(Moderation(bot))
\ No newline at end of file
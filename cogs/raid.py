@@ -0,0 +1,237 @@
+import discord
+
+from datetime import timedelta
+from discord import app_commands
+from discord.ext import commands
+from discord.utils import utcnow
+from utils.async_db import save_bans, save_timeouts
+from utils.config import config
+from utils.decorators import require_perm
+from utils.hardlock import hardlock_check
+from utils.logger import logger, log_to_channel, action_extra
+from utils.mass_actions import MAX_TARGETS, MassResult, collect_targets, run_bounded
+from utils.moderation_actions import safe_ban, safe_kick, safe_timeout
+
+MAX_TIMEOUT_SECONDS = 28 * 86400  # Discord-Limit
+# Wie viele fehlgeschlagene/übersprungene IDs im Summary aufgelistet werden
+SUMMARY_DETAIL_LINES = 15
+
+
+class Raid(commands.Cog):
+    """Mass-Moderation für Raids: viele Ziele, eine Zusammenfassung."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    # -----------------------------
+    # HELFER
+    # -----------------------------
+    async def _targets(
+        self,
+        interaction: discord.Interaction,
+        user_ids: str | None,
+        attachment: discord.Attachment | None,
+        joined_within: int | None,
+    ) -> list[int] | None:
+        try:
+            ids = await collect_targets(
+                interaction.guild,
+                user_ids=user_ids,
+                attachment=attachment,
+                joined_within=joined_within,
+            )
+        except ValueError as e:
+            await interaction.followup.send(f"❌ {e}", ephemeral=True)
+            return None
+
+        if not ids:
+            await interaction.followup.send(
+                "❌ Keine Ziele gefunden (IDs, Datei oder Join-Zeitfenster angeben).",
+                ephemeral=True
+            )
+            return None
+        if len(ids) > MAX_TARGETS:
+            await interaction.followup.send(
+                f"❌ Zu viele Ziele ({len(ids)}), max. {MAX_TARGETS} pro Befehl.",
+                ephemeral=True
+            )
+            return None
+        return ids
+
+    def _check_targets(
+        self,
+        interaction: discord.Interaction,
+        ids: list[int],
+        *,
+        members_only: bool,
+    ) -> tuple[list[discord.abc.Snowflake], dict[int, str]]:
+        """Hardlock pro Ziel. Nicht-Member gehen nur bei Bann (members_only=False)."""
+        guild = interaction.guild
+        targets, skipped = [], {}
+        for uid in ids:
+            member = guild.get_member(uid)
+            if member is None:
+                if members_only:
+                    skipped[uid] = "nicht auf dem Server"
+                elif uid in (interaction.user.id, self.bot.user.id):
+                    skipped[uid] = "Selbst/Bot"
+                else:
+                    targets.append(discord.Object(id=uid))
+                continue
+
+            allowed, reason = hardlock_check(interaction, member)
+            if not allowed:
+                skipped[uid] = reason.removeprefix("❌ ")
+                continue
+            targets.append(member)
+        return targets, skipped
+
+    async def _report(
+        self,
+        interaction: discord.Interaction,
+        action: str,
+        title: str,
+        color: discord.Color,
+        result: MassResult,
+        reason: str,
+    ):
+        """Eine Zusammenfassung in den Modlog + an den Moderator."""
+        summary = (
+            f"**Erfolgreich:** {len(result.done)}\n"
+            f"**Übersprungen:** {len(result.skipped)}\n"
+            f"**Fehlgeschlagen:** {len(result.failed)}"
+        )
+        embed = discord.Embed(title=title, color=color, timestamp=utcnow())
+        embed.add_field(name="Moderator", value=f"{interaction.user} ({interaction.user.id})", inline=False)
+        embed.add_field(name="Grund", value=reason, inline=False)
+        embed.add_field(name="Ergebnis", value=summary, inline=False)
+
+        problems = [f"`{uid}`: {why}" for uid, why in {**result.skipped, **result.failed}.items()]
+        if problems:
+            shown = problems[:SUMMARY_DETAIL_LINES]
+            if len(problems) > len(shown):
+                shown.append(f"... und {len(problems) - len(shown)} weitere")
+            embed.add_field(name="Nicht ausgeführt", value="\n".join(shown)[:1024], inline=False)
+
+        channel_id = int(config.log_channels.get("moderation", 0))
+        if channel_id:
+            await log_to_channel(self.bot, channel_id, title, embed=embed)
+
+        logger.info(
+            f"{action.upper()} | {interaction.user} | ok={len(result.done)} "
+            f"skipped={len(result.skipped)} failed={len(result.failed)} | {reason}",
+            extra=action_extra(action, interaction)
+        )
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    # -----------------------------
+    # MASSBAN
+    # -----------------------------
+    @app_commands.command(name="massban", description="Bannt viele User auf einmal (Raid)")
+    @app_commands.describe(
+        user_ids="IDs/Mentions, getrennt durch Leerzeichen, Komma oder Zeilen",
+        attachment="Textdatei mit User-IDs",
+        joined_within="Alle, die in den letzten X Minuten beigetreten sind",
+        reason="Grund für den Bann",
+        delete_days="Nachrichten der letzten X Tage löschen (0-7)"
+    )
+    @require_perm("massban")
+    async def massban(
+        self,
+        interaction: discord.Interaction,
+        user_ids: str | None = None,
+        attachment: discord.Attachment | None = None,
+        joined_within: app_commands.Range[int, 1, 1440] | None = None,
+        reason: str = "Raid",
+        delete_days: app_commands.Range[int, 0, 7] = 0
+    ):
+        await interaction.response.defer(ephemeral=True)
+
+        ids = await self._targets(interaction, user_ids, attachment, joined_within)
+        if ids is None:
+            return
+        targets, skipped = self._check_targets(interaction, ids, members_only=False)
+
+        result = await run_bounded(
+            targets,
+            lambda target: safe_ban(
+                interaction.guild, target, reason=reason, delete_message_seconds=delete_days * 86400
+            ),
+        )
+        result.skipped = skipped
+        # DB-Status in einem Auftrag
+        if result.done:
+            await save_bans(interaction.guild.id, result.done, reason)
+
+        await self._report(interaction, "massban", "🔨 Mass-Bann", discord.Color.dark_red(), result, reason)
+
+    # -----------------------------
+    # MASSKICK
+    # -----------------------------
+    @app_commands.command(name="masskick", description="Kickt viele User auf einmal (Raid)")
+    @app_commands.describe(
+        user_ids="IDs/Mentions, getrennt durch Leerzeichen, Komma oder Zeilen",
+        attachment="Textdatei mit User-IDs",
+        joined_within="Alle, die in den letzten X Minuten beigetreten sind",
+        reason="Grund für den Kick"
+    )
+    @require_perm("masskick")
+    async def masskick(
+        self,
+        interaction: discord.Interaction,
+        user_ids: str | None = None,
+        attachment: discord.Attachment | None = None,
+        joined_within: app_commands.Range[int, 1, 1440] | None = None,
+        reason: str = "Raid"
+    ):
+        await interaction.response.defer(ephemeral=True)
+
+        ids = await self._targets(interaction, user_ids, attachment, joined_within)
+        if ids is None:
+            return
+        targets, skipped = self._check_targets(interaction, ids, members_only=True)
+
+        result = await run_bounded(targets, lambda member: safe_kick(member, reason=reason))
+        result.skipped = skipped
+
+        await self._report(interaction, "masskick", "👢 Mass-Kick", discord.Color.orange(), result, reason)
+
+    # -----------------------------
+    # MASSTIMEOUT
+    # -----------------------------
+    @app_commands.command(name="masstimeout", description="Setzt viele User auf einmal in Timeout (Raid)")
+    @app_commands.describe(
+        duration="Dauer in Sekunden",
+        user_ids="IDs/Mentions, getrennt durch Leerzeichen, Komma oder Zeilen",
+        attachment="Textdatei mit User-IDs",
+        joined_within="Alle, die in den letzten X Minuten beigetreten sind",
+        reason="Grund für den Timeout"
+    )
+    @require_perm("masstimeout")
+    async def masstimeout(
+        self,
+        interaction: discord.Interaction,
+        duration: app_commands.Range[int, 1, MAX_TIMEOUT_SECONDS],
+        user_ids: str | None = None,
+        attachment: discord.Attachment | None = None,
+        joined_within: app_commands.Range[int, 1, 1440] | None = None,
+        reason: str = "Raid"
+    ):
+        await interaction.response.defer(ephemeral=True)
+
+        ids = await self._targets(interaction, user_ids, attachment, joined_within)
+        if ids is None:
+            return
+        targets, skipped = self._check_targets(interaction, ids, members_only=True)
+
+        until = utcnow() + timedelta(seconds=duration)
+        result = await run_bounded(targets, lambda member: safe_timeout(member, duration, reason=reason))
+        result.skipped = skipped
+        if result.done:
+            await save_timeouts(interaction.guild.id, result.done, until, reason)
+
+        await self._report(interaction, "masstimeout", "⏱️ Mass-Timeout", discord.Color.gold(), result, reason)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Raid(bot))
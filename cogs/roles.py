@@ -2,6 +2,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from utils.action_scheduler import Priority, actions
 from utils.decorators import require_perm
 from utils.hardening import can_moderate
 from utils.logger import logger, log_to_channel
@@ -69,9 +70,11 @@ class Roles(commands.Cog):
             return
 
         # Aktion
-        await user.add_roles(
-            role,
-            reason=f"Role add by {interaction.user}"
+        await actions.run(
+            f"roles:{interaction.guild.id}",
+            lambda: user.add_roles(role, reason=f"Role add by {interaction.user}"),
+            priority=Priority.ROLE,
+            action="role_add",
         )
 
         # Logging
@@ -134,9 +137,11 @@ class Roles(commands.Cog):
             return
 
         # Aktion
-        await user.remove_roles(
-            role,
-            reason=f"Role remove by {interaction.user}"
+        await actions.run(
+            f"roles:{interaction.guild.id}",
+            lambda: user.remove_roles(role, reason=f"Role remove by {interaction.user}"),
+            priority=Priority.ROLE,
+            action="role_remove",
         )
 
         # Logging
@@ -0,0 +1,139 @@
+"""
+Import / Export der Moderations-DB (warnings + punishments).
+
+Beispiele:
+    python db_tool.py export warnings -o warnings.ndjson
+    python db_tool.py export punishments --format csv --guild-id 123 -o punishments.csv
+    python db_tool.py import warnings warnings.ndjson
+    python db_tool.py import punishments punishments.csv --format csv
+
+Arbeitet streamend (Generatoren + executemany in Chunks) - der Speicherbedarf
+bleibt unabhängig von der Tabellengröße konstant.
+Import am besten bei gestopptem Bot ausführen: der laufende Bot hält
+Warn-Zähler im Cache und bekommt fremde Imports erst nach einem Neustart mit.
+"""
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+from utils.warnings_db import EXPORT_TABLES, close_db, import_table, init_db, iter_table
+
+
+def _detect_format(path: str | None, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    if path and Path(path).suffix.lower() == ".csv":
+        return "csv"
+    return "ndjson"
+
+
+def _progress(label: str):
+    def report(read: int, written: int | None = None):
+        if written is None:
+            print(f"\r{label}: {read} Zeilen", end="", file=sys.stderr, flush=True)
+        else:
+            print(f"\r{label}: {read} gelesen, {written} geschrieben", end="", file=sys.stderr, flush=True)
+    return report
+
+
+# ==================================================
+# EXPORT
+# ==================================================
+
+def export_rows(table: str, out, fmt: str, *, guild_id: int | None, chunk_size: int) -> int:
+    _, columns = EXPORT_TABLES[table]
+    report = _progress(f"Export {table}")
+    rows = iter_table(table, guild_id=guild_id, chunk_size=chunk_size)
+
+    csv_writer = None
+    if fmt == "csv":
+        csv_writer = csv.DictWriter(out, fieldnames=columns)
+        csv_writer.writeheader()
+
+    count = 0
+    for row in rows:
+        if csv_writer:
+            csv_writer.writerow(row)
+        else:
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+        count += 1
+        if count % chunk_size == 0:
+            report(count)
+
+    report(count)
+    print(file=sys.stderr)
+    return count
+
+
+# ==================================================
+# IMPORT
+# ==================================================
+
+def read_rows(src, fmt: str):
+    if fmt == "csv":
+        yield from csv.DictReader(src)
+        return
+    for line_no, line in enumerate(src, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise SystemExit(f"❌ Ungültiges JSON in Zeile {line_no}: {e}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="ChaosBot Moderations-DB Import/Export")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    exp = sub.add_parser("export", help="Tabelle als NDJSON/CSV exportieren")
+    exp.add_argument("table", choices=sorted(EXPORT_TABLES))
+    exp.add_argument("-o", "--output", help="Zieldatei (Standard: stdout)")
+    exp.add_argument("--format", choices=("ndjson", "csv"))
+    exp.add_argument("--guild-id", type=int, help="Nur diesen Server exportieren")
+    exp.add_argument("--chunk-size", type=int, default=1000)
+
+    imp = sub.add_parser("import", help="NDJSON/CSV in eine Tabelle importieren")
+    imp.add_argument("table", choices=sorted(EXPORT_TABLES))
+    imp.add_argument("input", help="Quelldatei ('-' = stdin)")
+    imp.add_argument("--format", choices=("ndjson", "csv"))
+    imp.add_argument("--keep-ids", action="store_true", help="Warn-IDs übernehmen statt neu vergeben")
+    imp.add_argument("--chunk-size", type=int, default=1000)
+
+    args = parser.parse_args(argv)
+    init_db()
+
+    try:
+        if args.command == "export":
+            fmt = _detect_format(args.output, args.format)
+            if args.output:
+                with open(args.output, "w", encoding="utf-8", newline="") as out:
+                    count = export_rows(args.table, out, fmt, guild_id=args.guild_id, chunk_size=args.chunk_size)
+            else:
+                count = export_rows(args.table, sys.stdout, fmt, guild_id=args.guild_id, chunk_size=args.chunk_size)
+            print(f"✅ {count} Zeilen aus {args.table} exportiert", file=sys.stderr)
+
+        else:
+            fmt = _detect_format(args.input, args.format)
+            src = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+            with src:
+                written = import_table(
+                    args.table,
+                    read_rows(src, fmt),
+                    chunk_size=args.chunk_size,
+                    keep_ids=args.keep_ids,
+                    progress=_progress(f"Import {args.table}"),
+                )
+            print(file=sys.stderr)
+            print(f"✅ {written} Zeilen in {args.table} geschrieben", file=sys.stderr)
+    finally:
+        close_db()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,11 +8,12 @@ from api.app import create_api
 from discord.ext import commands
 from dotenv import load_dotenv
 from utils.logger import logger, log_to_channel
-from utils.hardening import STAFF_ROLE_IDS
 from utils.config import config
 from discord import app_commands
-from utils.warnings_db import init_db
-from utils.hardening import STAFF_ROLE_IDS
+from utils.storage import get_store
+from utils.action_scheduler import actions
+from utils.modlog import modlog
+from utils.http import close_session
 
 
 load_dotenv()
@@ -22,8 +23,12 @@ TEST_GUILD_ID = config.guild_id  # dein Testserver
 
 intents = discord.Intents.default()
 intents.message_content = False
+# Privileged Intent (im Developer-Portal aktivieren): Member-Cache für
+# Raid-Zeitfenster, Gilden-Sync und Rollen-Events des Perm-Caches
+intents.members = True
 
-init_db()
+store = get_store()
+store.open()
 
 class ChaosBot(commands.Bot):
     def __init__(self):
@@ -38,12 +43,24 @@ class ChaosBot(commands.Bot):
         await self.load_extension("cogs.fun")
         await self.load_extension("cogs.roles")
         await self.load_extension("cogs.moderation")
+        await self.load_extension("cogs.maintenance")
+        await self.load_extension("cogs.events")
+        await self.load_extension("cogs.raid")
 
         # Slash Commands instant auf Testserver
         guild = discord.Object(id=TEST_GUILD_ID)
         self.tree.copy_global_to(guild=guild)
         await self.tree.sync(guild=guild)
 
+    async def close(self):
+        # Action-Worker stoppen, dann Log-Queue leeren, solange die Verbindung zu Discord noch steht
+        await actions.close()
+        await modlog.close()
+        await close_session()
+        await super().close()
+        # Offene DB-Aufträge abarbeiten, dann Verbindungen schließen (WAL-Checkpoint)
+        store.close()
+
 bot = ChaosBot()
 
 def start_api(bot):
@@ -53,13 +70,6 @@ def start_api(bot):
 @bot.event
 async def on_ready():
 
-    STAFF_ROLE_IDS.clear()
-
-    for key in config.role_management.get("staff_roles", []):
-        role_id = config.roles.get(key)
-        if role_id:
-            STAFF_ROLE_IDS.add(int(role_id))
-
     logger.info(f"✅ Eingeloggt als {bot.user} (ID: {bot.user.id})")
 
     #FastAPI parallel starten
@@ -0,0 +1,339 @@
+"""
+Zentrale Warteschlange für Discord-Aktionen (Ban, Kick, Timeout, Rollen, ...).
+
+- Prioritäten: Banns vor Kicks vor Timeouts vor Rollen-Änderungen
+- Token-Buckets pro Route (z.B. "ban:<guild_id>") + ein globaler Bucket,
+  damit Bulk-Aktionen gar nicht erst in 429er laufen
+- Jobs liegen pro Route in einem eigenen Heap; bereit sind Routes, nicht Jobs.
+  Ist der Bucket einer Route leer, wird die Route bis zum nächsten Token
+  geparkt - kein Worker wartet mit einem Job in der Hand, andere Routes laufen weiter
+- Retries: discord.py wiederholt 429er und 5xx (DiscordServerError) bereits
+  selbst. Hier gibt es nur noch max. MAX_RETRIES Versuch(e) für Netzwerkfehler
+  und 429er, die discord.py durchreicht (Route pausiert für retry_after)
+- Andere Fehler (Forbidden, NotFound, DiscordServerError, ...) gehen direkt an den Aufrufer
+- close() bricht Timer ab und beendet alle offenen Jobs mit RuntimeError
+
+Aufruf:
+    await actions.run(f"ban:{guild.id}", lambda: guild.ban(user), priority=Priority.BAN, action="ban")
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+import aiohttp
+import discord
+
+from utils.logger import logger
+
+
+class Priority(IntEnum):
+    BAN = 0
+    KICK = 1
+    TIMEOUT = 2
+    UNBAN = 3
+    ROLE = 5
+    DEFAULT = 5
+
+
+# (Requests, Sekunden) - Discord-Limits sind nicht dokumentiert, daher konservativ;
+# ein 429 pausiert die Route zusätzlich für die von Discord genannte Zeit.
+ROUTE_RATE = (5, 1.0)
+GLOBAL_RATE = (45, 1.0)   # Discord: 50 Requests/s global pro Bot
+WORKERS = 4
+MAX_RETRIES = 1           # discord.py wiederholt selbst, hier nur ein Zusatzversuch
+BACKOFF_BASE = 0.5        # Sekunden, verdoppelt sich pro Versuch
+
+
+class _Bucket:
+    """Token-Bucket, der nach einem 429 bis blocked_until pausiert."""
+
+    def __init__(self, rate: int, per: float):
+        self.capacity = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def delay(self) -> float:
+        """0 -> Token genommen, sonst Wartezeit in Sekunden (nichts genommen)."""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / self.per)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) * self.per / self.capacity
+
+    def block(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    route: str = field(compare=False)
+    factory: object = field(compare=False)
+    action: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued: float = field(compare=False)
+    attempts: int = field(default=0, compare=False)
+
+
+class ActionScheduler:
+    def __init__(
+        self,
+        *,
+        workers: int = WORKERS,
+        route_rate: tuple[int, float] = ROUTE_RATE,
+        global_rate: tuple[int, float] = GLOBAL_RATE,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self._worker_count = workers
+        self._route_rate = route_rate
+        self._global = _Bucket(*global_rate)
+        self._buckets: dict[str, _Bucket] = {}
+        self._max_retries = max_retries
+        # route -> Heap der wartenden Jobs
+        self._jobs: dict[str, list[_Job]] = {}
+        # Routes mit Arbeit: (priority, seq, route) des vordersten Jobs
+        self._ready: asyncio.PriorityQueue | None = None
+        # Routes, die in _ready stehen oder geparkt sind (höchstens einmal unterwegs)
+        self._active: set[str] = set()
+        self._running: dict[int, _Job] = {}  # seq -> Job, gerade in factory()
+        self._retrying: dict[int, _Job] = {}  # seq -> Job, wartet auf seinen Retry-Timer
+        self._timers: set[asyncio.TimerHandle] = set()
+        self._workers: list[asyncio.Task] = []
+        self._seq = itertools.count()
+        self._stats: dict[str, dict] = {}
+        self._closed = False
+
+    # ==================================================
+    # API
+    # ==================================================
+
+    async def run(self, route: str, factory, *, priority: int = Priority.DEFAULT, action: str | None = None):
+        """
+        factory() -> Coroutine mit dem eigentlichen API-Call (bei Retry neu erzeugt).
+        Liefert dessen Ergebnis oder wirft den endgültigen Fehler.
+        """
+        if self._closed:
+            raise RuntimeError("Action-Scheduler ist bereits geschlossen")
+        self._ensure_workers()
+        loop = asyncio.get_running_loop()
+        job = _Job(
+            priority=int(priority),
+            seq=next(self._seq),
+            route=route,
+            factory=factory,
+            action=action or route.split(":", 1)[0],
+            future=loop.create_future(),
+            enqueued=time.monotonic(),
+        )
+        self._push(job)
+        return await job.future
+
+    def queue_depth(self) -> int:
+        return sum(len(jobs) for jobs in self._jobs.values())
+
+    def stats(self) -> dict:
+        actions = {}
+        for action, s in self._stats.items():
+            done = s["ok"] + s["failed"]
+            actions[action] = {
+                "ok": s["ok"],
+                "failed": s["failed"],
+                "retries": s["retries"],
+                "avgMs": round(s["total_ms"] / done, 1) if done else 0.0,
+                "maxMs": round(s["max_ms"], 1),
+            }
+        return {"queued": self.queue_depth(), "actions": actions}
+
+    async def close(self):
+        self._closed = True
+        for handle in self._timers:
+            handle.cancel()
+        self._timers.clear()
+        # Laufende Jobs vor dem Abbruch merken - der Worker trägt sie beim Cancel aus
+        running = list(self._running.values())
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+        # Wartende, laufende und auf Retry wartende Jobs: Aufrufer nicht hängen lassen
+        pending = running + list(self._retrying.values())
+        for jobs in self._jobs.values():
+            pending += jobs
+        self._running.clear()
+        self._retrying.clear()
+        self._jobs.clear()
+        self._active.clear()
+        for job in pending:
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("Action-Scheduler wurde geschlossen"))
+
+    # ==================================================
+    # WORKER
+    # ==================================================
+
+    def _ensure_workers(self):
+        if self._ready is None:
+            self._ready = asyncio.PriorityQueue()
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self._worker_count:
+            self._workers.append(asyncio.create_task(self._worker(), name="action-scheduler"))
+
+    def _bucket(self, route: str) -> _Bucket:
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            bucket = self._buckets[route] = _Bucket(*self._route_rate)
+        return bucket
+
+    def _later(self, delay: float, callback, *args):
+        """call_later mit Buchführung, damit close() offene Timer abbrechen kann."""
+        handle = None
+
+        def fire():
+            self._timers.discard(handle)
+            callback(*args)
+
+        handle = asyncio.get_running_loop().call_later(delay, fire)
+        self._timers.add(handle)
+
+    def _push(self, job: _Job):
+        if self._closed:
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("Action-Scheduler wurde geschlossen"))
+            return
+        heapq.heappush(self._jobs.setdefault(job.route, []), job)
+        if job.route not in self._active:
+            self._active.add(job.route)
+            self._ready.put_nowait((job.priority, job.seq, job.route))
+
+    def _retry(self, job: _Job):
+        self._retrying.pop(job.seq, None)
+        self._push(job)
+
+    def _requeue_route(self, route: str):
+        """Route wieder bereitstellen (nach dem Parken) oder abmelden, wenn leer."""
+        jobs = self._jobs.get(route)
+        while jobs and jobs[0].future.done():  # Aufrufer hat abgebrochen
+            heapq.heappop(jobs)
+        if not jobs:
+            self._jobs.pop(route, None)
+            self._active.discard(route)
+            return
+        self._ready.put_nowait((jobs[0].priority, jobs[0].seq, route))
+
+    async def _worker(self):
+        while True:
+            _, _, route = await self._ready.get()
+            job = None
+            try:
+                job = self._next_job(route)
+                if job is not None:
+                    await self._execute(job)
+            except Exception as e:
+                # Unerwarteter Fehler (Bug) - Aufrufer nicht hängen lassen, Worker läuft weiter
+                logger.error(f"ACTIONS | Worker-Fehler ({route}) | {type(e).__name__}: {e}")
+                if job is not None and not job.future.done():
+                    job.future.set_exception(e)
+
+    def _next_job(self, route: str) -> _Job | None:
+        """Nächsten Job der Route nehmen - None, wenn leer oder geparkt."""
+        jobs = self._jobs.get(route)
+        while jobs and jobs[0].future.done():  # Aufrufer hat abgebrochen
+            heapq.heappop(jobs)
+        if not jobs:
+            self._jobs.pop(route, None)
+            self._active.discard(route)
+            return None
+
+        if (wait := self._bucket(route).delay()) > 0:
+            # Route parken, Worker nimmt sofort die nächste Route
+            self._later(wait, self._requeue_route, route)
+            return None
+
+        job = heapq.heappop(jobs)
+        # Restliche Jobs der Route dürfen parallel weiterlaufen (Bucket entscheidet)
+        self._requeue_route(route)
+        return job
+
+    async def _execute(self, job: _Job):
+        # Der globale Bucket gilt für alle Routes - hier zu warten blockiert niemanden zusätzlich
+        while (wait := self._global.delay()) > 0:
+            await asyncio.sleep(wait)
+
+        self._running[job.seq] = job
+        try:
+            result = await job.factory()
+        except Exception as e:
+            retry_after = self._retry_after(job, self._bucket(job.route), e)
+            if retry_after is None or job.attempts >= self._max_retries:
+                self._finish(job, ok=False)
+                if not job.future.done():
+                    job.future.set_exception(e)
+                return
+
+            job.attempts += 1
+            self._stat(job.action)["retries"] += 1
+            logger.warning(
+                f"ACTIONS | {job.action} ({job.route}) {type(e).__name__}, "
+                f"Retry {job.attempts}/{self._max_retries} in {retry_after:.2f}s"
+            )
+            self._retrying[job.seq] = job
+            self._later(retry_after, self._retry, job)
+            return
+        finally:
+            self._running.pop(job.seq, None)
+
+        self._finish(job, ok=True)
+        if not job.future.done():
+            job.future.set_result(result)
+
+    def _retry_after(self, job: _Job, bucket: _Bucket, error: Exception) -> float | None:
+        """Wartezeit bis zum nächsten Versuch - None = nicht wiederholbar."""
+        if isinstance(error, discord.RateLimited):
+            bucket.block(error.retry_after)
+            return error.retry_after
+        if isinstance(error, discord.HTTPException):
+            if error.status == 429:
+                retry_after = 1.0
+                if error.response is not None:
+                    try:
+                        retry_after = float(error.response.headers.get("Retry-After", retry_after))
+                    except (TypeError, ValueError):
+                        pass  # kaputter Header -> Standardwert
+                bucket.block(retry_after)
+                return retry_after
+            # Forbidden, NotFound, ... -> Retry sinnlos;
+            # 5xx hat discord.py schon mehrfach wiederholt (DiscordServerError)
+            return None
+        elif not isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError, OSError)):
+            return None
+        # Netzwerk: exponentieller Backoff mit Jitter
+        return BACKOFF_BASE * (2 ** job.attempts) * random.uniform(0.5, 1.5)
+
+    def _stat(self, action: str) -> dict:
+        stat = self._stats.get(action)
+        if stat is None:
+            stat = self._stats[action] = {"ok": 0, "failed": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0}
+        return stat
+
+    def _finish(self, job: _Job, *, ok: bool):
+        latency_ms = (time.monotonic() - job.enqueued) * 1000
+        stat = self._stat(job.action)
+        stat["ok" if ok else "failed"] += 1
+        stat["total_ms"] += latency_ms
+        stat["max_ms"] = max(stat["max_ms"], latency_ms)
+
+
+# Ein Scheduler für den ganzen Prozess
+actions = ActionScheduler()
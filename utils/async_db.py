@@ -0,0 +1,70 @@
+"""
+Awaitbarer Zugriff auf die Moderationsdaten.
+
+Gleiche Funktionen, gleiche Parameter wie utils.warnings_db - nur mit `await`:
+    warning_id = await async_db.add_warning(guild_id, user_id, mod_id, reason)
+
+Jeder Aufruf geht an das aktive Backend aus utils.storage (SQLite oder Memory,
+siehe config.yaml -> storage.backend). Cogs müssen das Backend nicht kennen.
+"""
+from datetime import datetime, timezone
+
+from utils.storage import get_store
+
+
+def auto_action_allowed(last_action, cooldown_seconds: int) -> bool:
+    """Reine Berechnung, kein I/O - unabhängig vom Backend."""
+    if not last_action:
+        return True
+    return (datetime.now(timezone.utc) - last_action["at"]).total_seconds() >= cooldown_seconds
+
+
+def _delegate(name: str):
+    async def wrapper(*args, **kwargs):
+        return await getattr(get_store(), name)(*args, **kwargs)
+    wrapper.__name__ = wrapper.__qualname__ = name
+    return wrapper
+
+
+def warn_cache_stats() -> dict:
+    return get_store().cache_stats()
+
+
+# ---- WARNINGS ----
+add_warning = _delegate("add_warning")
+count_warnings = _delegate("count_warnings")
+count_warnings_since = _delegate("count_warnings_since")
+delete_warnings = _delegate("delete_warnings")
+get_last_warning_id = _delegate("get_last_warning_id")
+get_warning_by_id = _delegate("get_warning_by_id")
+get_warning_page = _delegate("get_warning_page")
+delete_warning_by_id = _delegate("delete_warning_by_id")
+
+# ---- AUTO-ACTIONS ----
+get_last_auto_action = _delegate("get_last_auto_action")
+mark_auto_action = _delegate("mark_auto_action")
+
+# ---- PUNISHMENTS ----
+get_punishment = _delegate("get_punishment")
+get_expiring_timeouts = _delegate("get_expiring_timeouts")
+get_expiring_bans = _delegate("get_expiring_bans")
+get_banned_user_ids = _delegate("get_banned_user_ids")
+save_timeout = _delegate("save_timeout")
+save_timeouts = _delegate("save_timeouts")
+clear_timeout = _delegate("clear_timeout")
+save_ban = _delegate("save_ban")
+save_bans = _delegate("save_bans")
+mark_banned = _delegate("mark_banned")
+clear_ban = _delegate("clear_ban")
+get_user_status = _delegate("get_user_status")
+
+# ---- USER_STATS ----
+check_user_stats = _delegate("check_user_stats")
+
+# ---- RETENTION / ARCHIV ----
+archive_old_warnings = _delegate("archive_old_warnings")
+count_archived_warnings = _delegate("count_archived_warnings")
+
+# ---- SNAPSHOT ----
+get_user_snapshot = _delegate("get_user_snapshot")
+get_user_snapshots = _delegate("get_user_snapshots")
@@ -0,0 +1,121 @@
+"""
+Bann-Index pro Gilde (Set der gebannten User-IDs) - "ist X gebannt?" ohne REST-Call.
+
+- Aufgebaut in on_ready aus der paginierten Bannliste (guild.bans()),
+  neu aufgebaut bei jedem Gilden-Sync
+- Aktuell gehalten über on_member_ban / on_member_unban (cogs/events.py)
+- Events während des Aufbaus werden gepuffert und danach angewendet
+- check_drift() vergleicht den Index mit dem active_ban-Flag der DB
+"""
+import discord
+
+from utils.async_db import get_banned_user_ids
+from utils.logger import logger
+
+
+class BanIndex:
+    def __init__(self):
+        self._bans: dict[int, set[int]] = {}
+        # guild_id -> ein Puffer pro laufendem build() (Reconnect, Sync, ... können
+        # sich überschneiden); jedes Event landet in allen: (gebannt?, user_id)
+        self._building: dict[int, list[list[tuple[bool, int]]]] = {}
+        self._drift: dict[int, dict] = {}
+        self.lookups = 0
+
+    # ---- Aufbau ----
+    async def build(self, guild: discord.Guild) -> int:
+        pending: list[tuple[bool, int]] = []
+        buffers = self._building.setdefault(guild.id, [])
+        buffers.append(pending)
+        try:
+            banned = {entry.user.id async for entry in guild.bans(limit=None)}
+        finally:
+            # Nach Identität entfernen - leere Puffer anderer Builds sind gleich (==)
+            del buffers[next(i for i, buf in enumerate(buffers) if buf is pending)]
+            if not buffers and self._building.get(guild.id) is buffers:
+                del self._building[guild.id]
+        self._apply(guild.id, banned, pending)
+        return len(banned)
+
+    async def warm(self, bot: discord.Client):
+        """Index für alle Gilden aufbauen (on_ready)."""
+        for guild in bot.guilds:
+            try:
+                count = await self.build(guild)
+            except discord.HTTPException as e:
+                # z.B. fehlende "Mitglieder bannen"-Rechte -> Index bleibt leer, Aufrufer fallen zurück
+                logger.warning(f"BANS | Bannliste für {guild.id} nicht abrufbar: {type(e).__name__}: {e}")
+                continue
+            logger.info(f"BANS | {count} Bann(e) für {guild.id} indiziert")
+
+    def _apply(self, guild_id: int, banned: set[int], pending: list[tuple[bool, int]]):
+        for is_banned, user_id in pending:
+            if is_banned:
+                banned.add(user_id)
+            else:
+                banned.discard(user_id)
+        self._bans[guild_id] = banned
+
+    # ---- Abfragen ----
+    def is_ready(self, guild_id: int) -> bool:
+        return guild_id in self._bans
+
+    def is_banned(self, guild_id: int, user_id: int) -> bool | None:
+        """True/False aus dem Index, None wenn die Gilde (noch) nicht indiziert ist."""
+        bans = self._bans.get(guild_id)
+        if bans is None:
+            return None
+        self.lookups += 1
+        return user_id in bans
+
+    def banned(self, guild_id: int) -> frozenset[int]:
+        return frozenset(self._bans.get(guild_id, ()))
+
+    # ---- Events ----
+    def add(self, guild_id: int, user_id: int):
+        self._event(guild_id, True, user_id)
+
+    def remove(self, guild_id: int, user_id: int):
+        self._event(guild_id, False, user_id)
+
+    def _event(self, guild_id: int, is_banned: bool, user_id: int):
+        for pending in self._building.get(guild_id, ()):
+            pending.append((is_banned, user_id))
+        bans = self._bans.get(guild_id)
+        if bans is not None:
+            (bans.add if is_banned else bans.discard)(user_id)
+
+    def drop(self, guild_id: int):
+        self._bans.pop(guild_id, None)
+        self._drift.pop(guild_id, None)
+
+    # ---- Abgleich mit der DB ----
+    async def check_drift(self, guild_id: int) -> dict | None:
+        """
+        Unterschiede zwischen Index (Discord) und DB-active_ban.
+        Rückgabe: {"db_only": [...], "discord_only": [...]} oder None ohne Index.
+        """
+        bans = self._bans.get(guild_id)
+        if bans is None:
+            return None
+        db_bans = await get_banned_user_ids(guild_id)
+        drift = {
+            "db_only": sorted(db_bans - bans),
+            "discord_only": sorted(bans - db_bans),
+        }
+        self._drift[guild_id] = drift
+        return drift
+
+    def stats(self) -> dict:
+        return {
+            "guilds": len(self._bans),
+            "bans": sum(len(bans) for bans in self._bans.values()),
+            "lookups": self.lookups,
+            "drift": {
+                str(guild_id): {"dbOnly": len(d["db_only"]), "discordOnly": len(d["discord_only"])}
+                for guild_id, d in self._drift.items()
+            },
+        }
+
+
+ban_index = BanIndex()
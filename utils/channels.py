@@ -0,0 +1,102 @@
+"""
+Cache für Log-Ziele (Channel-IDs aus config.yaml -> Channel-Objekt).
+
+- Treffer kommen aus dem Cache, ohne bot.get_channel / REST-Fetch
+- Nicht erreichbare IDs (gelöscht, keine Rechte, Tippfehler in config.yaml)
+  werden NEGATIVE_TTL Sekunden als "fehlt" gemerkt -> kein HTTP-Call pro Log
+- Aufgewärmt in on_ready, aktuell gehalten über on_guild_channel_update/delete
+  (cogs/events.py) und bei jedem Config-Reload geleert
+"""
+import time
+
+import discord
+
+from utils.config import config
+from utils.logger import logger
+
+NEGATIVE_TTL = 300  # Sekunden
+
+
+class ChannelResolver:
+    def __init__(self, negative_ttl: float = NEGATIVE_TTL):
+        self._negative_ttl = negative_ttl
+        self._channels: dict[int, discord.abc.Messageable] = {}
+        self._missing: dict[int, float] = {}  # channel_id -> Ablaufzeit (monotonic)
+        self.hits = 0
+        self.fetches = 0
+        self.negative_hits = 0
+
+    async def resolve(self, bot: discord.Client, channel_id: int):
+        """Channel-Objekt oder None (dann ist die ID gerade nicht erreichbar)."""
+        channel = self._channels.get(channel_id)
+        if channel is not None:
+            self.hits += 1
+            return channel
+
+        expires = self._missing.get(channel_id)
+        if expires is not None:
+            if time.monotonic() < expires:
+                self.negative_hits += 1
+                return None
+            del self._missing[channel_id]
+
+        channel = bot.get_channel(channel_id)
+        if channel is None:
+            # Nicht im Gateway-Cache -> einmal fetchen
+            self.fetches += 1
+            try:
+                channel = await bot.fetch_channel(channel_id)
+            except (discord.NotFound, discord.Forbidden, discord.InvalidData) as e:
+                self.mark_missing(channel_id)
+                logger.warning(
+                    f"Log-Channel {channel_id} nicht abrufbar: {type(e).__name__}: {e} "
+                    f"(nächster Versuch in {self._negative_ttl}s)"
+                )
+                return None
+            except discord.HTTPException as e:
+                # Vorübergehender Fehler (5xx, Timeout) -> nicht negativ cachen
+                logger.warning(f"Log-Channel {channel_id} nicht abrufbar: {type(e).__name__}: {e}")
+                return None
+
+        self._channels[channel_id] = channel
+        return channel
+
+    async def warm(self, bot: discord.Client):
+        """Alle Log-Channels aus config.yaml vorab auflösen (on_ready)."""
+        resolved = 0
+        for channel_id in config.log_channels.values():
+            if channel_id and await self.resolve(bot, int(channel_id)) is not None:
+                resolved += 1
+        logger.info(f"CHANNELS | {resolved}/{len(config.log_channels)} Log-Channel(s) aufgelöst")
+
+    def mark_missing(self, channel_id: int):
+        self._channels.pop(channel_id, None)
+        self._missing[channel_id] = time.monotonic() + self._negative_ttl
+
+    # ---- Events ----
+    def update(self, channel):
+        if channel.id in self._channels:
+            self._channels[channel.id] = channel
+
+    def remove(self, channel_id: int):
+        if channel_id in self._channels:
+            self.mark_missing(channel_id)
+
+    def clear(self):
+        self._channels.clear()
+        self._missing.clear()
+
+    def stats(self) -> dict:
+        return {
+            "cached": len(self._channels),
+            "missing": len(self._missing),
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "negativeHits": self.negative_hits,
+        }
+
+
+channel_resolver = ChannelResolver()
+
+# Neue config.yaml -> evtl. andere Log-Channel-IDs
+config.subscribe(lambda cfg: channel_resolver.clear())
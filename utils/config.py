@@ -1,15 +1,157 @@
+import hashlib
+import logging
+import threading
 from pathlib import Path
 import yaml
 
+from utils.perm_level import PermLevel
+
 CONFIG_PATH = Path(__file__).resolve().parent.parent / "config.yaml"
 
+# utils.logger nicht importieren (Import-Zyklus) - gleicher Logger per Name
+logger = logging.getLogger("ChaosBot")
+
+
+class ConfigError(ValueError):
+    """config.yaml ist ungültig (Syntax oder Schema)."""
+
+
+# --- Schema: Abschnitt -> erwarteter Typ ---
+SCHEMA = {
+    "guild_id": int,
+    "roles": dict,
+    "log_channels": dict,
+    "log_webhooks": dict,
+    "role_management": dict,
+    "permissions": dict,
+    "security": dict,
+    "moderation": dict,
+    "storage": dict,
+    "logging": dict,
+}
+
+
+_PERM_LEVELS = {level.value for level in PermLevel}
+
+
+def validate(data) -> dict:
+    """Prüft die geparste config.yaml. Wirft ConfigError mit allen Fehlern."""
+    if not isinstance(data, dict):
+        raise ConfigError("config.yaml muss ein Mapping sein")
+
+    errors = []
+    for key, expected in SCHEMA.items():
+        value = data.get(key)
+        if value is not None and not isinstance(value, expected):
+            errors.append(f"{key}: erwartet {expected.__name__}, bekommen {type(value).__name__}")
+
+    for key, role_id in (data.get("roles") or {}).items():
+        if role_id is not None and not isinstance(role_id, int):
+            errors.append(f"roles.{key}: Rollen-ID muss eine Zahl sein")
+
+    for key, channel_id in (data.get("log_channels") or {}).items():
+        if channel_id is not None and not isinstance(channel_id, int):
+            errors.append(f"log_channels.{key}: Channel-ID muss eine Zahl sein")
+
+    for key, url in (data.get("log_webhooks") or {}).items():
+        if url and not (isinstance(url, str) and (url.startswith("https://") or url.startswith("env:"))):
+            errors.append(f"log_webhooks.{key}: erwartet https://-URL oder env:NAME")
+
+    for action, perm_cfg in (data.get("permissions") or {}).items():
+        if not isinstance(perm_cfg, dict) or not isinstance(perm_cfg.get("min_level"), int):
+            errors.append(f"permissions.{action}: min_level (Zahl) fehlt")
+        elif perm_cfg["min_level"] not in _PERM_LEVELS:
+            errors.append(f"permissions.{action}: min_level {perm_cfg['min_level']} ist kein gültiges Level")
+
+    # Zahlen (Schwellen, Sekunden, ...) >= 0 oder Schalter (true/false)
+    for key, value in (data.get("moderation") or {}).items():
+        if isinstance(value, bool):
+            continue
+        if not isinstance(value, int) or value < 0:
+            errors.append(f"moderation.{key}: muss eine Zahl >= 0 oder true/false sein")
+
+    if errors:
+        raise ConfigError("❌ config.yaml ungültig:\n" + "\n".join(f"• {e}" for e in errors))
+    return data
+
+
 class Config:
-    def __init__(self):
-        if not CONFIG_PATH.exists():
-            raise FileNotFoundError(f"❌ config.yaml nicht gefunden unter {CONFIG_PATH}")
+    """
+    Aktueller Stand von config.yaml.
+
+    Der Inhalt ist ein Snapshot, der nie verändert, sondern bei reload()
+    als Ganzes ersetzt wird (eine Zuweisung -> atomar). Ungültige Dateien
+    werden abgelehnt, der alte Snapshot bleibt aktiv.
+    Subscriber (subscribe) werden nach jedem erfolgreichen Reload aufgerufen.
+    """
+
+    def __init__(self, path: Path = CONFIG_PATH):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"❌ config.yaml nicht gefunden unter {self.path}")
 
-        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-            self._data = yaml.safe_load(f) or {}
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._mtime, raw = self._read()
+        self._hash = hashlib.sha256(raw).hexdigest()
+        self._data = self._parse(raw)
+
+    # ==================================================
+    # RELOAD
+    # ==================================================
+
+    def _read(self) -> tuple[float, bytes]:
+        mtime = self.path.stat().st_mtime
+        return mtime, self.path.read_bytes()
+
+    @staticmethod
+    def _parse(raw: bytes) -> dict:
+        try:
+            data = yaml.safe_load(raw) or {}
+        except yaml.YAMLError as e:
+            raise ConfigError(f"❌ config.yaml: YAML-Fehler: {e}") from e
+        return validate(data)
+
+    def changed(self) -> bool:
+        """Billiger Poll: nur mtime vergleichen."""
+        try:
+            return self.path.stat().st_mtime != self._mtime
+        except FileNotFoundError:
+            return False
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Liest config.yaml neu, wenn sich der Inhalt (Hash) geändert hat.
+        Rückgabe: True -> neuer Snapshot aktiv. Wirft ConfigError bei ungültiger Datei.
+        """
+        with self._lock:
+            mtime, raw = self._read()
+            digest = hashlib.sha256(raw).hexdigest()
+            # mtime merken, auch wenn der Inhalt gleich ist (z.B. touch)
+            self._mtime = mtime
+            if digest == self._hash and not force:
+                return False
+
+            data = self._parse(raw)
+            self._data = data
+            self._hash = digest
+
+        for callback in list(self._subscribers):
+            try:
+                callback(self)
+            except Exception:
+                logger.exception(f"CONFIG | Subscriber {getattr(callback, '__name__', callback)} fehlgeschlagen")
+        logger.info("CONFIG | config.yaml neu geladen")
+        return True
+
+    def subscribe(self, callback):
+        """callback(config) wird nach jedem erfolgreichen Reload aufgerufen."""
+        self._subscribers.append(callback)
+        return callback
+
+    # ==================================================
+    # ABSCHNITTE
+    # ==================================================
 
     @property
     def guild_id(self) -> int:
@@ -22,23 +164,38 @@ class Config:
     @property
     def log_channels(self) -> dict:
         return self._data.get("log_channels", {})
-    
+
+    @property
+    def log_webhooks(self) -> dict:
+        webhooks = self._data.get("log_webhooks", {})
+        return webhooks if isinstance(webhooks, dict) else {}
+
     @property
     def moderation(self) -> dict:
         return self._data.get("moderation", {})
-    
+
     @property
     def role_management(self) -> dict:
         return self._data.get("role_management", {})
-    
+
     @property
     def permissions(self) -> dict:
         return self._data.get("permissions", {})
-    
+
     @property
     def security(self) -> dict:
         sec =self._data.get("security", {})
         return sec if isinstance(sec, dict) else {}
-    
+
+    @property
+    def logging(self) -> dict:
+        log_cfg = self._data.get("logging", {})
+        return log_cfg if isinstance(log_cfg, dict) else {}
+
+    @property
+    def storage(self) -> dict:
+        storage = self._data.get("storage", {})
+        return storage if isinstance(storage, dict) else {}
+
 # Singleton
 config = Config()
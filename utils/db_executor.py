@@ -0,0 +1,34 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# Eigene Threads nur für DB-Arbeit -> sqlite blockiert nie den Event-Loop
+DB_WORKERS = 4
+# Obergrenze für gleichzeitig wartende DB-Aufträge (Backpressure bei Raids)
+MAX_PENDING = 256
+
+_executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="db")
+_pending = asyncio.Semaphore(MAX_PENDING)
+
+
+async def run_db(func, /, *args, **kwargs):
+    """
+    Führt eine synchrone DB-Funktion im DB-Threadpool aus.
+    Sind bereits MAX_PENDING Aufträge unterwegs, wartet der Aufrufer
+    (statt die Queue unbegrenzt wachsen zu lassen).
+    """
+    async with _pending:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _executor, functools.partial(func, *args, **kwargs)
+        )
+
+
+def pending_jobs() -> int:
+    """Anzahl aktuell belegter Queue-Plätze."""
+    return MAX_PENDING - _pending._value
+
+
+def shutdown_db_executor():
+    """Wartet auf laufende DB-Aufträge und beendet die Threads."""
+    _executor.shutdown(wait=True)
@@ -0,0 +1,143 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# --- Pragmas für jede Verbindung ---
+# WAL: Leser blockieren den Writer nicht mehr, Commits sind ein Append statt
+# Rollback-Journal + fsync. synchronous=NORMAL ist im WAL-Modus crash-sicher.
+PRAGMAS = (
+    # Muss vor der ersten Tabelle gesetzt sein (neue DB); alte DBs: siehe vacuum()
+    "PRAGMA auto_vacuum = INCREMENTAL",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",      # ~16 MB Page-Cache pro Verbindung
+    "PRAGMA mmap_size = 67108864",     # 64 MB Memory-Mapped I/O
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA foreign_keys = ON",
+)
+
+# sqlite3 cached vorbereitete Statements pro Verbindung (LRU nach SQL-Text).
+# Da die Verbindungen jetzt langlebig sind, werden die Statements wiederverwendet.
+STATEMENT_CACHE_SIZE = 128
+
+
+class ConnectionPool:
+    """
+    Langlebige SQLite-Verbindungen: genau ein Writer + kleiner Reader-Pool.
+
+    - write(): exklusiver Zugriff auf den Writer, eine Transaktion pro Block
+    - read():  leiht eine Reader-Verbindung aus (WAL -> paralleles Lesen)
+    """
+
+    def __init__(self, path: Path, readers: int = 4):
+        self.path = Path(path)
+        self._reader_count = max(1, readers)
+        self._writer: sqlite3.Connection | None = None
+        self._write_lock = threading.RLock()
+        self._readers: queue.Queue[sqlite3.Connection] = queue.Queue()
+        self._all: list[sqlite3.Connection] = []
+        self._init_lock = threading.Lock()
+        self._closed = False
+
+    # ==================================================
+    # VERBINDUNGEN
+    # ==================================================
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,      # Zugriff wird über Locks/Queue serialisiert
+            isolation_level=None,         # Transaktionen steuern wir selbst
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        self._all.append(conn)
+        return conn
+
+    def _ensure_open(self):
+        if self._writer is not None:
+            return
+        with self._init_lock:
+            if self._writer is not None:
+                return
+            if self._closed:
+                raise RuntimeError("ConnectionPool ist bereits geschlossen")
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Writer zuerst: setzt journal_mode=WAL persistent in der DB-Datei
+            writer = self._connect()
+            for _ in range(self._reader_count):
+                self._readers.put(self._connect())
+            self._writer = writer
+
+    @contextmanager
+    def write(self):
+        """Exklusive Schreib-Transaktion (BEGIN IMMEDIATE ... COMMIT/ROLLBACK)."""
+        self._ensure_open()
+        with self._write_lock:
+            conn = self._writer
+            if conn.in_transaction:
+                # Verschachtelter Aufruf im selben Thread -> äußere Transaktion nutzen
+                yield conn
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+
+    @contextmanager
+    def read(self):
+        """Leiht eine Reader-Verbindung aus dem Pool (blockiert, wenn alle belegt sind)."""
+        self._ensure_open()
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    # ==================================================
+    # WARTUNG (außerhalb von Transaktionen)
+    # ==================================================
+
+    def auto_vacuum_mode(self) -> int:
+        """0 = NONE, 1 = FULL, 2 = INCREMENTAL"""
+        # Über den Writer lesen - Reader sehen den Header nach VACUUM evtl. noch veraltet
+        self._ensure_open()
+        with self._write_lock:
+            return self._writer.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+    def vacuum(self):
+        """Kompletter VACUUM - schreibt die Datei neu (übernimmt auch auto_vacuum)."""
+        self._ensure_open()
+        with self._write_lock:
+            self._writer.execute("VACUUM")
+
+    def incremental_vacuum(self, pages: int = 0):
+        """Gibt freie Seiten an das Dateisystem zurück (0 = alle)."""
+        self._ensure_open()
+        with self._write_lock:
+            self._writer.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+
+    def close(self):
+        """Schließt alle Verbindungen (z.B. beim Shutdown)."""
+        with self._init_lock, self._write_lock:
+            self._closed = True
+            if self._writer is not None:
+                # WAL in die Hauptdatei zurückschreiben, damit die -wal Datei klein bleibt
+                try:
+                    self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                except sqlite3.Error:
+                    pass
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+            self._writer = None
@@ -0,0 +1,167 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from utils.logger import logger
+
+# Ein Batch wird committet, sobald FLUSH_INTERVAL vergangen ist
+# oder MAX_BATCH Schreibaufträge zusammengekommen sind.
+FLUSH_INTERVAL = 0.005  # Sekunden
+MAX_BATCH = 200
+
+_STOP = object()
+
+
+class BatchWriter:
+    """
+    Write-Behind-Queue für alle schreibenden DB-Zugriffe.
+
+    submit(op, *args) reiht op(conn, *args) ein und gibt sofort ein Future zurück.
+    Ein Hintergrund-Thread sammelt die Aufträge und schreibt sie in EINER
+    Transaktion (ein fsync statt einem pro Zeile). Jeder Auftrag läuft in einem
+    eigenen SAVEPOINT - schlägt einer fehl, betrifft das nur sein Future.
+    Das Future wird erst nach dem COMMIT erfüllt.
+
+    Ops können per after_commit() Nacharbeit anmelden (z.B. Caches anpassen),
+    die erst nach dem COMMIT läuft - vorher sehen Reader noch den alten Stand.
+    """
+
+    def __init__(
+        self,
+        pool,
+        *,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_batch: int = MAX_BATCH,
+        on_failure=None,
+    ):
+        self._pool = pool
+        # Wird aufgerufen, wenn ein ganzer Batch zurückgerollt wurde
+        # (z.B. um Caches zu leeren, die die Ops schon angepasst haben)
+        self._on_failure = on_failure
+        self._flush_interval = flush_interval
+        self._max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._closed = False
+        # after_commit()-Hooks der aktuell laufenden Op (nur im Writer-Thread benutzt)
+        self._op_hooks: list | None = None
+
+    def submit(self, op, /, *args) -> Future:
+        future = Future()
+        # Unter dem Lock: ein Auftrag ist entweder vor _STOP eingereiht oder abgelehnt
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BatchWriter ist bereits geschlossen")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+            self._queue.put((future, op, args))
+        return future
+
+    def after_commit(self, func, /, *args):
+        """Nur aus einer Op heraus: func(*args) nach erfolgreichem COMMIT ausführen."""
+        if self._op_hooks is None:
+            raise RuntimeError("after_commit() nur innerhalb einer Writer-Op")
+        self._op_hooks.append((func, args))
+
+    def pending(self) -> int:
+        """Anzahl noch nicht geschriebener Aufträge."""
+        return self._queue.qsize()
+
+    def flush(self, timeout: float | None = None):
+        """Blockiert, bis alles bisher Eingereihte committet ist."""
+        if self._thread is None:
+            return
+        self.submit(lambda conn: None).result(timeout)
+
+    def close(self):
+        """Restliche Aufträge schreiben und den Thread beenden (Shutdown-Hook)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join()
+
+    # ==================================================
+    # WRITER-THREAD
+    # ==================================================
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self._flush_interval
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: list):
+        done = []
+        hooks = []
+        try:
+            with self._pool.write() as conn:
+                for future, op, args in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    conn.execute("SAVEPOINT batch_op")
+                    self._op_hooks = []
+                    try:
+                        result = op(conn, *args)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO batch_op")
+                        conn.execute("RELEASE batch_op")
+                        done.append((future, None, e))
+                    else:
+                        conn.execute("RELEASE batch_op")
+                        hooks += self._op_hooks
+                        done.append((future, result, None))
+                    finally:
+                        self._op_hooks = None
+        except Exception as e:
+            # BEGIN (z.B. SQLITE_BUSY), SAVEPOINT/RELEASE oder COMMIT fehlgeschlagen
+            # -> nichts aus diesem Batch ist gespeichert. JEDES offene Future auflösen,
+            # auch die noch nicht gestarteten, sonst hängen .result()/await ewig.
+            logger.error(f"DB WRITER | Batch mit {len(batch)} Auftrag/Aufträgen fehlgeschlagen: {e!r}")
+            if self._on_failure is not None:
+                try:
+                    self._on_failure()
+                except Exception:
+                    logger.exception("DB WRITER | on_failure fehlgeschlagen")
+            for future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Erst nach dem COMMIT: Caches etc. anpassen, dann Futures erfüllen
+        for func, args in hooks:
+            try:
+                func(*args)
+            except Exception:
+                logger.exception("DB WRITER | after_commit-Hook fehlgeschlagen")
+
+        for future, result, error in done:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -0,0 +1,233 @@
+"""
+Ablauf von Strafen: Timeouts und temporäre Banns.
+
+Fällige Einträge kommen per Partial-Index-Query aus punishments in einen
+Min-Heap; der Task schläft bis zur nächsten Deadline (oder bis schedule()
+etwas Früheres meldet). Die DB bleibt die Wahrheit - nach einem Neustart
+werden überfällige Einträge beim ersten Laden sofort abgearbeitet.
+"""
+import asyncio
+import heapq
+from datetime import datetime, timedelta
+
+import discord
+from discord.ext import commands
+from discord.utils import utcnow
+
+from utils.action_scheduler import Priority, actions
+from utils.async_db import (
+    clear_ban,
+    clear_timeout,
+    get_expiring_bans,
+    get_expiring_timeouts,
+    get_punishment,
+    save_timeout,
+)
+from utils.config import config
+from utils.logger import logger, log_to_channel
+from utils.timestamps import to_ms
+
+# Alles, was innerhalb von HORIZON abläuft, liegt im Heap; neu geladen wird
+# spätestens alle REFRESH - so wird kein Eintrag verpasst, der nicht per schedule() kam.
+HORIZON = timedelta(minutes=10)
+REFRESH = timedelta(minutes=5)
+BACKLOG_REFRESH = timedelta(seconds=5)
+LOAD_LIMIT = 500
+RETRY_DELAY = timedelta(minutes=5)  # z.B. Unban / DB-Write fehlgeschlagen
+
+TIMEOUT = "timeout"
+BAN = "ban"
+
+
+class ExpiryScheduler:
+    def __init__(self):
+        # (until_ms, kind, guild_id, user_id)
+        self._heap: list[tuple[int, str, int, int]] = []
+        # (kind, guild_id, user_id) -> until_ms des aktuell gültigen Heap-Eintrags
+        self._pending: dict[tuple[str, int, int], int] = {}
+        # (kind, guild_id, user_id) -> Retry-Zeitpunkt; solange gesetzt, überspringt
+        # _load() den (überfälligen) DB-Eintrag, sonst wäre RETRY_DELAY wirkungslos
+        self._retry_at: dict[tuple[str, int, int], int] = {}
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._bot: commands.Bot | None = None
+        self._expired = {TIMEOUT: 0, BAN: 0}
+
+    # ==================================================
+    # API
+    # ==================================================
+
+    def start(self, bot: commands.Bot):
+        if self._task is None or self._task.done():
+            self._bot = bot
+            self._task = asyncio.create_task(self._run(), name="punishment-expiry")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def schedule(self, kind: str, guild_id: int, user_id: int, until: datetime):
+        """Nach save_timeout / save_ban(until=...) aufrufen - weckt den Task bei früherer Deadline."""
+        until_ms = to_ms(until)
+        if until_ms > to_ms(utcnow() + HORIZON):
+            return  # kommt mit dem nächsten Refresh aus der DB
+        self._retry_at.pop((kind, guild_id, user_id), None)  # neuer Stand ersetzt den Retry
+        self._push(until_ms, kind, guild_id, user_id)
+        if self._heap[0][0] == until_ms:
+            self._wake.set()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "next": self._heap[0][0] if self._heap else None,
+            "expired": dict(self._expired),
+        }
+
+    # ==================================================
+    # LOOP
+    # ==================================================
+
+    def _push(self, until_ms: int, kind: str, guild_id: int, user_id: int):
+        key = (kind, guild_id, user_id)
+        if self._pending.get(key) == until_ms:
+            return
+        # Ältere Einträge desselben Keys bleiben im Heap und werden beim Pop verworfen
+        self._pending[key] = until_ms
+        heapq.heappush(self._heap, (until_ms, kind, guild_id, user_id))
+
+    async def _load(self) -> bool:
+        """True, wenn das Limit erreicht wurde (es liegt noch mehr in der DB)."""
+        before = utcnow() + HORIZON
+        full = False
+        for kind, query in ((TIMEOUT, get_expiring_timeouts), (BAN, get_expiring_bans)):
+            # Einträge im Retry belegen die ältesten Plätze - um so viele mehr laden,
+            # damit dauerhaft fehlschlagende Einträge neuere nicht aussperren
+            retrying = sum(1 for key in self._retry_at if key[0] == kind)
+            rows = await query(before, LOAD_LIMIT + retrying)
+            full |= len(rows) >= LOAD_LIMIT + retrying
+            for row in rows:
+                if (kind, row["guild_id"], row["user_id"]) in self._retry_at:
+                    continue
+                self._push(to_ms(row["until"]), kind, row["guild_id"], row["user_id"])
+        return full
+
+    async def _run(self):
+        await self._bot.wait_until_ready()
+        next_refresh = 0
+        while True:
+            now_ms = to_ms(utcnow())
+            if now_ms >= next_refresh:
+                refresh = REFRESH
+                try:
+                    if await self._load():
+                        refresh = BACKLOG_REFRESH  # Rückstau nach Neustart zügig abbauen
+                except Exception as e:
+                    logger.error(f"EXPIRY LOAD FAILED | {type(e).__name__}: {e}")
+                next_refresh = now_ms + int(refresh.total_seconds() * 1000)
+
+            # Alles Fällige abarbeiten
+            while self._heap and self._heap[0][0] <= now_ms:
+                until_ms, kind, guild_id, user_id = heapq.heappop(self._heap)
+                key = (kind, guild_id, user_id)
+                if self._pending.get(key) != until_ms:
+                    continue  # überholt
+                del self._pending[key]
+                self._retry_at.pop(key, None)
+                try:
+                    await self._expire(kind, guild_id, user_id, until_ms)
+                except Exception as e:
+                    logger.error(f"EXPIRY FAILED | {kind} {guild_id}/{user_id} | {type(e).__name__}: {e}")
+                    self._retry(kind, guild_id, user_id)
+
+            deadline = min(self._heap[0][0], next_refresh) if self._heap else next_refresh
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), max(0, deadline - to_ms(utcnow())) / 1000)
+            except asyncio.TimeoutError:
+                pass
+
+    def _retry(self, kind: str, guild_id: int, user_id: int):
+        retry_ms = to_ms(utcnow() + RETRY_DELAY)
+        self._retry_at[(kind, guild_id, user_id)] = retry_ms
+        self._push(retry_ms, kind, guild_id, user_id)
+
+    # ==================================================
+    # ABLAUF
+    # ==================================================
+
+    async def _expire(self, kind: str, guild_id: int, user_id: int, until_ms: int):
+        # DB erneut lesen: Eintrag kann inzwischen geändert/aufgehoben sein
+        punishment = await get_punishment(guild_id, user_id)
+        if punishment is None:
+            return
+        if kind == TIMEOUT:
+            current = punishment["active_timeout_until"]
+        else:
+            current = punishment["ban_until"] if punishment["active_ban"] else None
+        if current is None:
+            return
+        if to_ms(current) > until_ms:
+            self.schedule(kind, guild_id, user_id, current)  # verlängert
+            return
+
+        if kind == TIMEOUT:
+            await self._expire_timeout(guild_id, user_id)
+        else:
+            await self._expire_ban(guild_id, user_id)
+
+    async def _expire_timeout(self, guild_id: int, user_id: int):
+        # Discord beendet den Timeout selbst; nur wenn dort länger gesetzt wurde, DB nachziehen
+        guild = self._bot.get_guild(guild_id)
+        member = guild.get_member(user_id) if guild else None
+        if member is not None and member.is_timed_out() and member.timed_out_until > utcnow():
+            await save_timeout(guild_id, user_id, member.timed_out_until)
+            self.schedule(TIMEOUT, guild_id, user_id, member.timed_out_until)
+            logger.info(f"EXPIRY | Timeout {guild_id}/{user_id} bei Discord verlängert, DB nachgezogen")
+            return
+
+        await clear_timeout(guild_id, user_id)
+        self._expired[TIMEOUT] += 1
+        logger.info(f"EXPIRY | Timeout abgelaufen | {guild_id}/{user_id}")
+
+    async def _expire_ban(self, guild_id: int, user_id: int):
+        guild = self._bot.get_guild(guild_id)
+        if guild is None:
+            # Bot ist nicht (mehr) auf dem Server (Ausfälle melden discord.py-Gilden als
+            # unavailable, nicht als fehlend) -> Unban unmöglich, Eintrag nicht ewig wiederholen
+            await clear_ban(guild_id, user_id)
+            logger.warning(f"EXPIRY | Temporärer Bann {guild_id}/{user_id}: Server nicht verfügbar, DB-Eintrag entfernt")
+            return
+
+        try:
+            await actions.run(
+                f"bans:{guild_id}",
+                lambda: guild.unban(discord.Object(id=user_id), reason="Temporärer Bann abgelaufen"),
+                priority=Priority.UNBAN,
+                action="expire_ban",
+            )
+        except discord.NotFound:
+            pass  # bei Discord schon entbannt -> DB trotzdem bereinigen
+        except discord.HTTPException as e:
+            logger.error(f"EXPIRY | Unban {guild_id}/{user_id} fehlgeschlagen: {e}")
+            self._retry(BAN, guild_id, user_id)
+            return
+
+        await clear_ban(guild_id, user_id)
+        self._expired[BAN] += 1
+        logger.info(f"EXPIRY | Temporärer Bann abgelaufen | {guild_id}/{user_id}")
+
+        channel_id = int(config.log_channels.get("moderation", 0))
+        if channel_id:
+            await log_to_channel(
+                self._bot,
+                channel_id,
+                "⏰ Temporärer Bann abgelaufen",
+                f"**User-ID:** {user_id}",
+                discord.Color.green(),
+            )
+
+
+# Ein Scheduler für den ganzen Prozess
+expiry = ExpiryScheduler()
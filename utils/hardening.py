@@ -2,9 +2,7 @@ import discord
 from utils.perm_level import PermLevel
 from utils.permissions import get_user_perm_level
 from utils.logger import logger
-from utils.config import config
-
-STAFF_ROLE_IDS: set[int] =set()
+from utils.policy import get_policy
 
 def can_moderate(
     *,
@@ -55,10 +53,4 @@ def can_moderate(
     return True, None
 
 def is_staff_role(role: discord.Role) -> bool:
-    staff_role_keys = config.role_management.get("staff_roles", [])
-    staff_role_ids = {
-        int(config.roles.get(key))
-        for key in staff_role_keys
-        if config.roles.get(key)
-    }
-    return role.id in staff_role_ids
+    return role.id in get_policy().staff_role_ids
@@ -0,0 +1,29 @@
+"""
+Eine gemeinsame aiohttp-Session für ausgehende HTTP-Aufrufe (z.B. Log-Webhooks).
+Hält Verbindungen offen (Keep-Alive) statt pro Request neu zu verbinden.
+"""
+import aiohttp
+
+# Max. gleichzeitige Verbindungen (gesamt / pro Host)
+POOL_LIMIT = 20
+POOL_LIMIT_PER_HOST = 10
+
+_session: aiohttp.ClientSession | None = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Lazy auf dem laufenden Event-Loop erzeugen."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=POOL_LIMIT, limit_per_host=POOL_LIMIT_PER_HOST),
+            timeout=aiohttp.ClientTimeout(total=15),
+        )
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
@@ -1,59 +1,159 @@
+import atexit
+import gzip
+import json
 import logging
+import os
+import queue
+import shutil
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 import discord
 
+from utils.config import config
+
 # --- file path ---
 LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 LOG_FILE = LOG_DIR / "bot.log"
 
-# --- create our own logger (do NOT rely on basicConfig) ---
-logger = logging.getLogger("ChaosBot")
-logger.setLevel(logging.INFO)
+# Felder, die per extra={...} mitgegeben werden und im JSON-Format eigene Keys bekommen
+STRUCTURED_FIELDS = ("action", "actor_id", "target_id", "guild_id", "latency_ms", "stages")
 
-if not logger.handlers:
+
+# ==================================================
+# FORMATTER / HANDLER
+# ==================================================
+
+class JsonLinesFormatter(logging.Formatter):
+    """Eine JSON-Zeile pro Log-Eintrag (für Tools ohne Regex-Parsing)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SizeTimeRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotiert bei max_bytes ODER nach rotate_hours (was zuerst eintritt).
+    Rotierte Dateien werden gzip-komprimiert (bot.log.1.gz, bot.log.2.gz, ...).
+    Läuft im Listener-Thread - Rotation und gzip blockieren den Event-Loop nicht.
+    """
+
+    def __init__(self, filename, *, max_bytes: int, backup_count: int, rotate_hours: float):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self._interval = rotate_hours * 3600
+        self._next_rollover = time.time() + self._interval if self._interval > 0 else None
+        self.namer = lambda name: name + ".gz"
+        self.rotator = _gzip_rotator
+
+    def shouldRollover(self, record) -> bool:
+        if self._next_rollover is not None and time.time() >= self._next_rollover:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        if self._next_rollover is not None:
+            self._next_rollover = time.time() + self._interval
+
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+# ==================================================
+# SETUP
+# ==================================================
+# logger.info() legt den Record nur in eine Queue (QueueHandler);
+# ein Hintergrund-Thread (QueueListener) schreibt Datei + Konsole.
+
+def _build_listener() -> QueueListener:
+    log_cfg = config.logging
     fmt = logging.Formatter("%(asctime)s | %(levelname)s | %(message)s")
 
-    fh = logging.FileHandler(LOG_FILE, encoding="utf-8")
-    fh.setLevel(logging.INFO)
-    fh.setFormatter(fmt)
+    fh = SizeTimeRotatingFileHandler(
+        LOG_FILE,
+        max_bytes=int(log_cfg.get("max_bytes", 10 * 1024 * 1024)),
+        backup_count=int(log_cfg.get("backup_count", 7)),
+        rotate_hours=float(log_cfg.get("rotate_hours", 24)),
+    )
+    fh.setFormatter(JsonLinesFormatter() if log_cfg.get("format") == "json" else fmt)
 
     sh = logging.StreamHandler()
-    sh.setLevel(logging.INFO)
     sh.setFormatter(fmt)
 
-    logger.addHandler(fh)
-    logger.addHandler(sh)
+    return QueueListener(_log_queue, fh, sh, respect_handler_level=True)
+
+
+# --- create our own logger (do NOT rely on basicConfig) ---
+logger = logging.getLogger("ChaosBot")
+logger.setLevel(getattr(logging, str(config.logging.get("level", "INFO")).upper(), logging.INFO))
+
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+if not logger.handlers:
+    logger.addHandler(QueueHandler(_log_queue))
+    _listener = _build_listener()
+    _listener.start()
+    # Beim Beenden Queue leeren und Dateien schließen
+    atexit.register(_listener.stop)
 
 # prevent double logs if root logger also prints
 logger.propagate = False
 
 
+def action_extra(action: str, interaction: discord.Interaction, target=None) -> dict:
+    """
+    Strukturierte Felder für logger.*(..., extra=...).
+    latency_ms = Zeit seit Erstellung der Interaction (Klick -> Aktion erledigt).
+    """
+    latency = (discord.utils.utcnow() - interaction.created_at).total_seconds() * 1000
+    return {
+        "action": action,
+        "actor_id": interaction.user.id,
+        "target_id": getattr(target, "id", target),
+        "guild_id": interaction.guild_id,
+        "latency_ms": round(latency, 1),
+    }
+
+
 async def log_to_channel(
     bot: discord.Client,
     channel_id: int,
     title: str,
-    description: str,
+    description: str | None = None,
     color: discord.Color = discord.Color.blurple(),
+    *,
+    embed: discord.Embed | None = None,
 ):
+    """
+    Reiht ein Log-Embed ein und kehrt sofort zurück (utils.modlog sendet gebündelt).
+    Entweder title/description/color oder ein fertiges `embed` übergeben.
+    """
+    # Lazy Import: utils.modlog importiert selbst den Logger
+    from utils.modlog import modlog
+
     if not channel_id or channel_id == 0:
         logger.warning("Log-Channel-ID ist 0/leer (config.yaml). Kein Embed gesendet.")
         return
 
-    channel = bot.get_channel(channel_id)
-
-    # If not cached, fetch it (more reliable)
-    if channel is None:
-        try:
-            channel = await bot.fetch_channel(channel_id)
-        except Exception as e:
-            logger.warning(f"Log-Channel {channel_id} nicht abrufbar: {type(e).__name__}: {e}")
-            return
-
-    embed = discord.Embed(title=title, description=description, color=color)
-    embed.set_footer(text="ChaosBot Logger")
+    if embed is None:
+        embed = discord.Embed(title=title, description=description, color=color)
+    if not embed.footer.text:
+        embed.set_footer(text="ChaosBot Logger")
 
-    try:
-        await channel.send(embed=embed)
-    except Exception as e:
-        logger.warning(f"Embed konnte nicht gesendet werden: {type(e).__name__}: {e}")
+    modlog.enqueue(bot, channel_id, embed)
@@ -0,0 +1,86 @@
+"""
+Hilfen für Mass-Moderation (Raid-Aufräumen): Ziele sammeln und
+Aktionen mit begrenzter Parallelität ausführen.
+"""
+import asyncio
+import re
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import discord
+from discord.utils import utcnow
+
+# Gleichzeitig eingereihte Aktionen pro Mass-Befehl. Das eigentliche Tempo
+# bestimmt der Action-Scheduler (Route-/Global-Buckets) - hier nur so viel,
+# dass seine Buckets nie leer laufen.
+MASS_CONCURRENCY = 20
+MAX_TARGETS = 500
+MAX_ATTACHMENT_BYTES = 256 * 1024
+
+_ID_PATTERN = re.compile(r"\b\d{17,20}\b")
+
+
+def parse_ids(text: str) -> list[int]:
+    """Alle Discord-IDs aus Text (Komma, Leerzeichen, Zeilen, Mentions) - ohne Duplikate."""
+    return list(dict.fromkeys(int(match) for match in _ID_PATTERN.findall(text or "")))
+
+
+async def collect_targets(
+    guild: discord.Guild,
+    *,
+    user_ids: str | None = None,
+    attachment: discord.Attachment | None = None,
+    joined_within: int | None = None,
+) -> list[int]:
+    """
+    Ziel-IDs aus ID-Liste, Textdatei und/oder Join-Zeitfenster (Minuten).
+    Das Zeitfenster nutzt den Member-Cache (braucht den Members-Intent).
+    """
+    ids = parse_ids(user_ids or "")
+
+    if attachment is not None:
+        if attachment.size > MAX_ATTACHMENT_BYTES:
+            raise ValueError(f"Datei zu groß (max. {MAX_ATTACHMENT_BYTES // 1024} KB).")
+        content = await attachment.read()
+        ids += parse_ids(content.decode("utf-8", errors="ignore"))
+
+    if joined_within:
+        if not guild.chunked:
+            # Ohne vollständigen Member-Cache wäre die Liste still unvollständig
+            raise ValueError("Member-Liste nicht geladen (Members-Intent aktiv?) - Zeitfenster nicht möglich.")
+        since = utcnow() - timedelta(minutes=joined_within)
+        ids += [
+            member.id for member in guild.members
+            if member.joined_at and member.joined_at >= since and not member.bot
+        ]
+
+    return list(dict.fromkeys(ids))
+
+
+@dataclass
+class MassResult:
+    done: list[int] = field(default_factory=list)
+    skipped: dict[int, str] = field(default_factory=dict)
+    failed: dict[int, str] = field(default_factory=dict)
+
+
+async def run_bounded(targets, action, *, limit: int = MASS_CONCURRENCY) -> MassResult:
+    """
+    action(target) -> (ok, error) für alle Ziele, höchstens `limit` gleichzeitig.
+    Die safe_*-Helper werfen nicht, daher bricht ein Fehlschlag nichts ab.
+    """
+    result = MassResult()
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(target):
+        async with semaphore:
+            ok, error = await action(target)
+        if ok:
+            result.done.append(target.id)
+        else:
+            result.failed[target.id] = error
+
+    async with asyncio.TaskGroup() as tg:
+        for target in targets:
+            tg.create_task(run(target))
+    return result
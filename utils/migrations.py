@@ -0,0 +1,420 @@
+import sqlite3
+
+from utils.logger import logger
+from utils.timestamps import iso_to_ms
+
+# ==================================================
+# MIGRATIONEN
+# ==================================================
+# Jede Migration läuft genau einmal, in eigener Transaktion.
+# Die erreichte Version steht in PRAGMA user_version der DB-Datei.
+# Neue Schritte IMMER hinten anhängen, bestehende nie ändern.
+
+
+def _base_schema(conn: sqlite3.Connection):
+    # ---- WARNINGS ----
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS warnings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        moderator_id INTEGER NOT NULL,
+        reason TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        auto_action_type TEXT,
+        auto_action_at TEXT
+    )
+    """)
+
+    # Alte DBs (vor user_version) haben die Auto-Action-Spalten evtl. noch nicht
+    cur = conn.execute("PRAGMA table_info(warnings)")
+    cols = {row[1] for row in cur.fetchall()}
+
+    if "auto_action_type" not in cols:
+        conn.execute("ALTER TABLE warnings ADD COLUMN auto_action_type TEXT")
+
+    if "auto_action_at" not in cols:
+        conn.execute("ALTER TABLE warnings ADD COLUMN auto_action_at TEXT")
+
+    # ---- PUNISHMENTS ----
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS punishments (
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        active_timeout_until TEXT,
+        active_ban INTEGER DEFAULT 0,
+        reason TEXT,
+        PRIMARY KEY (guild_id, user_id)
+    )
+    """)
+
+
+def _warning_indexes(conn: sqlite3.Connection):
+    # count_warnings / get_last_warning_id: reiner Index-Scan statt Full-Scan
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_warnings_user
+    ON warnings (guild_id, user_id, id)
+    """)
+    # get_last_auto_action: nur Zeilen mit Auto-Aktion landen im Index
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_warnings_auto_action
+    ON warnings (guild_id, user_id, auto_action_at)
+    WHERE auto_action_at IS NOT NULL
+    """)
+
+
+def _backfill_auto_action_at(conn: sqlite3.Connection):
+    # Ältere Versionen haben auto_action_type teils ohne Zeitstempel geschrieben.
+    # Ohne auto_action_at fehlen diese Zeilen im Partial-Index und in der Cooldown-Logik.
+    cur = conn.execute("""
+    UPDATE warnings
+    SET auto_action_at = created_at
+    WHERE auto_action_type IS NOT NULL
+      AND auto_action_at IS NULL
+    """)
+    if cur.rowcount:
+        logger.info(f"DB MIGRATION | auto_action_at für {cur.rowcount} Verwarnung(en) nachgetragen")
+
+
+# ---- USER_STATS (denormalisierte Aggregate, per Trigger gepflegt) ----
+
+# Letzte Auto-Aktion eines Users - gleiche Sortierung überall (Partial-Index)
+_LAST_AUTO_ACTION = """
+    SELECT {col} FROM warnings w
+    WHERE w.guild_id = {g} AND w.user_id = {u} AND w.auto_action_at IS NOT NULL
+    ORDER BY w.auto_action_at DESC, w.id DESC
+    LIMIT 1
+"""
+
+
+def _last_auto_action(col: str, g: str, u: str) -> str:
+    return "(" + _LAST_AUTO_ACTION.format(col=col, g=g, u=u) + ")"
+
+
+def rebuild_user_stats(conn: sqlite3.Connection):
+    """Berechnet user_stats komplett neu aus warnings (Reparatur bei Drift)."""
+    conn.execute("DELETE FROM user_stats")
+    conn.execute(f"""
+    INSERT INTO user_stats (
+        guild_id, user_id, warn_count, last_warn_id,
+        last_auto_action_type, last_auto_action_at
+    )
+    SELECT
+        x.guild_id, x.user_id, COUNT(*), MAX(x.id),
+        {_last_auto_action("w.auto_action_type", "x.guild_id", "x.user_id")},
+        {_last_auto_action("w.auto_action_at", "x.guild_id", "x.user_id")}
+    FROM warnings x
+    GROUP BY x.guild_id, x.user_id
+    """)
+
+
+def verify_user_stats(conn: sqlite3.Connection) -> int:
+    """Anzahl der User, deren user_stats-Zeile nicht zu warnings passt."""
+    actual = f"""
+    SELECT
+        x.guild_id, x.user_id, COUNT(*), MAX(x.id),
+        {_last_auto_action("w.auto_action_type", "x.guild_id", "x.user_id")},
+        {_last_auto_action("w.auto_action_at", "x.guild_id", "x.user_id")}
+    FROM warnings x
+    GROUP BY x.guild_id, x.user_id
+    """
+    stored = """
+    SELECT guild_id, user_id, warn_count, last_warn_id,
+           last_auto_action_type, last_auto_action_at
+    FROM user_stats
+    WHERE warn_count > 0
+    """
+    cur = conn.execute(f"""
+    SELECT COUNT(*) FROM (
+        SELECT guild_id, user_id FROM ({actual} EXCEPT {stored})
+        UNION
+        SELECT guild_id, user_id FROM ({stored} EXCEPT {actual})
+    )
+    """)
+    return cur.fetchone()[0]
+
+
+def _user_stats(conn: sqlite3.Connection):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS user_stats (
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        warn_count INTEGER NOT NULL DEFAULT 0,
+        last_warn_id INTEGER,
+        last_auto_action_type TEXT,
+        last_auto_action_at TEXT,
+        PRIMARY KEY (guild_id, user_id)
+    ) WITHOUT ROWID
+    """)
+    _create_user_stats_triggers(conn)
+
+    # Einmalig aus dem Bestand befüllen
+    rebuild_user_stats(conn)
+
+
+def _create_user_stats_triggers(conn: sqlite3.Connection):
+    # INSERT: inkrementell (heißer Pfad bei /warn)
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_warnings_insert_stats
+    AFTER INSERT ON warnings
+    BEGIN
+        INSERT INTO user_stats (
+            guild_id, user_id, warn_count, last_warn_id,
+            last_auto_action_type, last_auto_action_at
+        )
+        VALUES (
+            NEW.guild_id, NEW.user_id, 1, NEW.id,
+            NEW.auto_action_type, NEW.auto_action_at
+        )
+        ON CONFLICT (guild_id, user_id) DO UPDATE SET
+            warn_count = warn_count + 1,
+            last_warn_id = MAX(COALESCE(last_warn_id, 0), excluded.last_warn_id),
+            last_auto_action_type = CASE
+                WHEN excluded.last_auto_action_at IS NOT NULL
+                 AND (last_auto_action_at IS NULL OR excluded.last_auto_action_at >= last_auto_action_at)
+                THEN excluded.last_auto_action_type ELSE last_auto_action_type END,
+            last_auto_action_at = CASE
+                WHEN excluded.last_auto_action_at IS NOT NULL
+                 AND (last_auto_action_at IS NULL OR excluded.last_auto_action_at >= last_auto_action_at)
+                THEN excluded.last_auto_action_at ELSE last_auto_action_at END;
+    END
+    """)
+
+    # UPDATE (mark_auto_action): letzte Auto-Aktion neu bestimmen
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_warnings_update_stats
+    AFTER UPDATE OF auto_action_type, auto_action_at ON warnings
+    BEGIN
+        UPDATE user_stats SET
+            last_auto_action_type = {_last_auto_action("w.auto_action_type", "NEW.guild_id", "NEW.user_id")},
+            last_auto_action_at = {_last_auto_action("w.auto_action_at", "NEW.guild_id", "NEW.user_id")}
+        WHERE guild_id = NEW.guild_id AND user_id = NEW.user_id;
+    END
+    """)
+
+    # DELETE: Zähler runter, Rest nur neu suchen, wenn genau diese Zeile die letzte war
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_warnings_delete_stats
+    AFTER DELETE ON warnings
+    BEGIN
+        UPDATE user_stats SET
+            warn_count = MAX(warn_count - 1, 0),
+            last_warn_id = CASE
+                WHEN last_warn_id = OLD.id
+                THEN (SELECT MAX(w.id) FROM warnings w
+                      WHERE w.guild_id = OLD.guild_id AND w.user_id = OLD.user_id)
+                ELSE last_warn_id END,
+            last_auto_action_type = CASE
+                WHEN OLD.auto_action_at IS NOT NULL AND OLD.auto_action_at = last_auto_action_at
+                THEN {_last_auto_action("w.auto_action_type", "OLD.guild_id", "OLD.user_id")}
+                ELSE last_auto_action_type END,
+            last_auto_action_at = CASE
+                WHEN OLD.auto_action_at IS NOT NULL AND OLD.auto_action_at = last_auto_action_at
+                THEN {_last_auto_action("w.auto_action_at", "OLD.guild_id", "OLD.user_id")}
+                ELSE last_auto_action_at END
+        WHERE guild_id = OLD.guild_id AND user_id = OLD.user_id;
+    END
+    """)
+
+
+def _warnings_archive(conn: sqlite3.Connection):
+    # Gleiche Spalten wie warnings (+ archived_at) - IDs bleiben erhalten
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS warnings_archive (
+        id INTEGER PRIMARY KEY,
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        moderator_id INTEGER NOT NULL,
+        reason TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        auto_action_type TEXT,
+        auto_action_at TEXT,
+        archived_at TEXT NOT NULL
+    )
+    """)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_warnings_archive_user
+    ON warnings_archive (guild_id, user_id)
+    """)
+    # Retention sucht die ältesten Warns
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_warnings_created
+    ON warnings (created_at)
+    """)
+
+
+def _epoch_timestamps(conn: sqlite3.Connection):
+    # Alle Zeitstempel: ISO-Text -> INTEGER ms seit Epoch (UTC).
+    # SQLite kann Spaltentypen nicht ändern -> Tabellen neu anlegen und umkopieren.
+    conn.create_function("iso_to_ms", 1, iso_to_ms, deterministic=True)
+
+    # ---- WARNINGS ----
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'warnings'").fetchone()
+    old_seq = row[0] if row else 0
+
+    conn.execute("""
+    CREATE TABLE warnings_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        moderator_id INTEGER NOT NULL,
+        reason TEXT NOT NULL,
+        created_at INTEGER NOT NULL,
+        auto_action_type TEXT,
+        auto_action_at INTEGER
+    )
+    """)
+    conn.execute("""
+    INSERT INTO warnings_new
+    SELECT id, guild_id, user_id, moderator_id, reason,
+           iso_to_ms(created_at), auto_action_type, iso_to_ms(auto_action_at)
+    FROM warnings
+    """)
+    # Indizes und user_stats-Trigger verschwinden mit der alten Tabelle
+    conn.execute("DROP TABLE warnings")
+    conn.execute("ALTER TABLE warnings_new RENAME TO warnings")
+
+    # AUTOINCREMENT-Stand übernehmen, damit gelöschte IDs nicht neu vergeben werden
+    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM warnings").fetchone()[0]
+    conn.execute("DELETE FROM sqlite_sequence WHERE name = 'warnings'")
+    conn.execute(
+        "INSERT INTO sqlite_sequence (name, seq) VALUES ('warnings', ?)",
+        (max(old_seq, max_id),)
+    )
+
+    _warning_indexes(conn)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_warnings_created
+    ON warnings (created_at)
+    """)
+    # "Warns seit T" pro User
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_warnings_user_created
+    ON warnings (guild_id, user_id, created_at)
+    """)
+
+    # ---- USER_STATS ----
+    conn.execute("DROP TABLE user_stats")
+    conn.execute("""
+    CREATE TABLE user_stats (
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        warn_count INTEGER NOT NULL DEFAULT 0,
+        last_warn_id INTEGER,
+        last_auto_action_type TEXT,
+        last_auto_action_at INTEGER,
+        PRIMARY KEY (guild_id, user_id)
+    ) WITHOUT ROWID
+    """)
+    _create_user_stats_triggers(conn)
+    rebuild_user_stats(conn)
+
+    # ---- WARNINGS_ARCHIVE ----
+    conn.execute("""
+    CREATE TABLE warnings_archive_new (
+        id INTEGER PRIMARY KEY,
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        moderator_id INTEGER NOT NULL,
+        reason TEXT NOT NULL,
+        created_at INTEGER NOT NULL,
+        auto_action_type TEXT,
+        auto_action_at INTEGER,
+        archived_at INTEGER NOT NULL
+    )
+    """)
+    conn.execute("""
+    INSERT INTO warnings_archive_new
+    SELECT id, guild_id, user_id, moderator_id, reason,
+           iso_to_ms(created_at), auto_action_type, iso_to_ms(auto_action_at),
+           iso_to_ms(archived_at)
+    FROM warnings_archive
+    """)
+    conn.execute("DROP TABLE warnings_archive")
+    conn.execute("ALTER TABLE warnings_archive_new RENAME TO warnings_archive")
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_warnings_archive_user
+    ON warnings_archive (guild_id, user_id)
+    """)
+
+    # ---- PUNISHMENTS ----
+    conn.execute("""
+    CREATE TABLE punishments_new (
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        active_timeout_until INTEGER,
+        active_ban INTEGER DEFAULT 0,
+        reason TEXT,
+        PRIMARY KEY (guild_id, user_id)
+    )
+    """)
+    conn.execute("""
+    INSERT INTO punishments_new
+    SELECT guild_id, user_id, iso_to_ms(active_timeout_until), active_ban, reason
+    FROM punishments
+    """)
+    conn.execute("DROP TABLE punishments")
+    conn.execute("ALTER TABLE punishments_new RENAME TO punishments")
+    # "Timeouts, die vor T ablaufen"
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_punishments_timeout
+    ON punishments (active_timeout_until)
+    WHERE active_timeout_until IS NOT NULL
+    """)
+
+
+def _ban_until(conn: sqlite3.Connection):
+    # Temporäre Banns: Ablaufzeitpunkt (ms), NULL = permanent
+    conn.execute("ALTER TABLE punishments ADD COLUMN ban_until INTEGER")
+    # "Banns, die vor T ablaufen" (Expiry-Scheduler)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_punishments_ban_until
+    ON punishments (ban_until)
+    WHERE ban_until IS NOT NULL
+    """)
+
+
+MIGRATIONS = [
+    (1, "base_schema", _base_schema),
+    (2, "warning_indexes", _warning_indexes),
+    (3, "backfill_auto_action_at", _backfill_auto_action_at),
+    (4, "user_stats", _user_stats),
+    (5, "warnings_archive", _warnings_archive),
+    (6, "epoch_timestamps", _epoch_timestamps),
+    (7, "ban_until", _ban_until),
+]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(pool) -> int:
+    """
+    Bringt die DB auf den neuesten Stand.
+    Rückgabe: erreichte Schema-Version
+    """
+    with pool.read() as conn:
+        current = get_schema_version(conn)
+
+    for version, name, step in MIGRATIONS:
+        if version <= current:
+            continue
+
+        with pool.write() as conn:
+            # Nochmal im Write-Lock prüfen (zweiter Prozess könnte schneller gewesen sein)
+            if get_schema_version(conn) >= version:
+                continue
+            step(conn)
+            # PRAGMA erlaubt keine Parameter - version ist ein int aus MIGRATIONS
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+
+        logger.info(f"DB MIGRATION | v{version} {name} angewendet")
+        current = version
+
+    # DBs von vor auto_vacuum=INCREMENTAL einmalig umstellen (VACUUM geht nur ohne Transaktion)
+    if pool.auto_vacuum_mode() != 2:
+        logger.info("DB MIGRATION | Stelle auf auto_vacuum=INCREMENTAL um (einmaliger VACUUM)")
+        pool.vacuum()
+
+    return current
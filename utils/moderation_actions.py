@@ -1,7 +1,24 @@
 import discord
 from datetime import timedelta
 from discord.utils import utcnow
+from utils.action_scheduler import Priority, actions
 from utils.config import config
+from utils.logger import logger
+
+
+def _error_message(error: Exception, forbidden: str, action: str) -> str:
+    """Fehlertext für den Moderator - der Scheduler hat Retries schon hinter sich."""
+    if isinstance(error, discord.Forbidden):
+        return forbidden
+    if isinstance(error, discord.NotFound):
+        return "User/Ban wurde von Discord nicht gefunden."
+    if isinstance(error, discord.RateLimited) or getattr(error, "status", None) == 429:
+        return "Discord-Rate-Limit erreicht, bitte gleich erneut versuchen."
+    if isinstance(error, discord.DiscordServerError):
+        return "Discord ist gerade nicht erreichbar (Serverfehler)."
+    logger.exception(f"ACTIONS | {action} fehlgeschlagen: {error!r}")
+    return f"Unerwarteter Fehler ({type(error).__name__})."
+
 
 async def safe_timeout(
     member: discord.Member,
@@ -19,12 +36,15 @@ async def safe_timeout(
 
     try:
         until = utcnow() + timedelta(seconds=duration_seconds)
-        await member.timeout(until, reason=reason)
+        await actions.run(
+            f"members:{member.guild.id}",
+            lambda: member.timeout(until, reason=reason),
+            priority=Priority.TIMEOUT,
+            action="timeout",
+        )
         return True, ""
-    except discord.Forbidden:
-        return False, "Discord hat den Timeout blockiert (keine Rechte)."
-    except Exception:
-        return False, "Unerwarteter Fehler beim Setzen des Timeouts."
+    except Exception as e:
+        return False, _error_message(e, "Discord hat den Timeout blockiert (keine Rechte).", "timeout")
 
 
 async def safe_untimeout(
@@ -39,12 +59,15 @@ async def safe_untimeout(
         return False, "User ist aktuell nicht im Timeout."
 
     try:
-        await member.timeout(None, reason=reason)
+        await actions.run(
+            f"members:{member.guild.id}",
+            lambda: member.timeout(None, reason=reason),
+            priority=Priority.TIMEOUT,
+            action="untimeout",
+        )
         return True, ""
-    except discord.Forbidden:
-        return False, "Discord hat das Entfernen blockiert (keine Rechte)."
-    except Exception:
-        return False, "Unerwarteter Fehler beim Entfernen des Timeouts."
+    except Exception as e:
+        return False, _error_message(e, "Discord hat das Entfernen blockiert (keine Rechte).", "untimeout")
 
 async def safe_kick(
     member: discord.Member,
@@ -57,12 +80,15 @@ async def safe_kick(
         (success, error_message)
     """
     try:
-        await member.kick(reason=reason)
+        await actions.run(
+            f"members:{member.guild.id}",
+            lambda: member.kick(reason=reason),
+            priority=Priority.KICK,
+            action="kick",
+        )
         return True, ""
-    except discord.Forbidden:
-        return False, "Discord hat den Kick blockiert (keine Rechte)."
-    except Exception:
-        return False, "Unerwarteter Fehler beim Kicken des Users."
+    except Exception as e:
+        return False, _error_message(e, "Discord hat den Kick blockiert (keine Rechte).", "kick")
     
 async def safe_ban(
     guild: discord.Guild,
@@ -77,12 +103,15 @@ async def safe_ban(
         (success, error_message)
     """
     try:
-        await guild.ban(target, reason=reason, delete_message_seconds=delete_message_seconds)
+        await actions.run(
+            f"bans:{guild.id}",
+            lambda: guild.ban(target, reason=reason, delete_message_seconds=delete_message_seconds),
+            priority=Priority.BAN,
+            action="ban",
+        )
         return True, ""
-    except discord.Forbidden:
-        return False, "Discord hat den Ban blockiert (keine Rechte)."
-    except Exception:
-        return False, "Unerwarteter Fehler beim Bannen des Users."
+    except Exception as e:
+        return False, _error_message(e, "Discord hat den Ban blockiert (keine Rechte).", "ban")
     
 async def safe_unban(
     guild: discord.Guild,
@@ -96,12 +125,15 @@ async def safe_unban(
         (success, error_message)
     """
     try:
-        await guild.unban(target, reason=reason)
+        await actions.run(
+            f"bans:{guild.id}",
+            lambda: guild.unban(target, reason=reason),
+            priority=Priority.UNBAN,
+            action="unban",
+        )
         return True, ""
-    except discord.Forbidden:
-        return False, "Discord hat das Unbannen blockiert (keine Rechte)."
-    except Exception:
-        return False, "Unerwarteter Fehler beim Unbannen des Users."
+    except Exception as e:
+        return False, _error_message(e, "Discord hat das Unbannen blockiert (keine Rechte).", "unban")
 
 def get_auto_action_preview(warn_count: int) -> str | None:
     mod_cfg = config.moderation
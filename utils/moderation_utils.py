@@ -2,11 +2,10 @@ import discord
 from datetime import timedelta
 from discord.utils import utcnow
 
+from utils.action_scheduler import Priority, actions
 from utils.permissions import get_user_perm_level, PermLevel
 from utils.logger import logger, log_to_channel
-from utils.warnings_db import (
-    add_warning,
-    count_warnings,
+from utils.async_db import (
     get_last_auto_action,
     mark_auto_action,
     auto_action_allowed,
@@ -58,32 +57,39 @@ async def handle_auto_actions(*,
     Rückgabe: True -> Aktion durchgeführt (Ban/Kick/Timeout)
     False -> keine Aktion durchgeführt
     """
-    last_action = get_last_auto_action(
+    last_action = await get_last_auto_action(
         guild_id=interaction.guild.id,
         user_id=user.id
     )
 
     if not auto_action_allowed(
         last_action,
-        config["moderation"]["auto_action_cooldown"]
+        int(config.moderation.get("auto_action_cooldown", 0))
     ):
         logger.info(f"AUTO ACTION BLOCKED (COOLDOWN) | {user}")
-        return
+        return False
     last_type = last_action["type"] if last_action else None
     channel_id = int(config.log_channels.get("moderation", 0))
 
     # 🔨 BAN
     if total_warnings >= ban_warn:
-        if last_action != "kick":
+        # Bann erst nach vorherigem Auto-Kick (Eskalation)
+        if last_type != "kick":
             return False
         try:
-            await user.ban(
-                reason="Automatischer Bann durch Verwarnungen",
-                delete_message_days=0
+            await actions.run(
+                f"bans:{user.guild.id}",
+                lambda: user.ban(reason="Automatischer Bann durch Verwarnungen", delete_message_seconds=0),
+                priority=Priority.BAN,
+                action="auto_ban",
             )
         except discord.Forbidden:
             logger.error(f"AUTO BAN FAILED | Keine Berechtigung zum Bann | {user}")
             return False
+        except (discord.HTTPException, RuntimeError) as e:
+            # NotFound (User weg), 5xx, Action-Scheduler geschlossen
+            logger.error(f"AUTO BAN FAILED | {type(e).__name__}: {e} | {user}")
+            return False
         
         if channel_id:
             await log_to_channel(
@@ -94,20 +100,29 @@ async def handle_auto_actions(*,
                 f"**Warns:** {total_warnings}",
                 discord.Color.dark_red()
             )
-        mark_auto_action(warning_id, "ban")
+        await mark_auto_action(warning_id, "ban")
         logger.info(f"AUTO BANN | {user}")
         return True
 
     # 👢 KICK
     if total_warnings >= kick_warn:
-        if last_action in ("kick", "ban"):
-            return
+        if last_type in ("kick", "ban"):
+            return False
         
         try:
-            await user.kick(reason="Automatischer Kick durch Verwarnungen")
+            await actions.run(
+                f"members:{user.guild.id}",
+                lambda: user.kick(reason="Automatischer Kick durch Verwarnungen"),
+                priority=Priority.KICK,
+                action="auto_kick",
+            )
         except discord.Forbidden:
             logger.error(f"AUTO KICK FAILED | Keine Berechtigung zum Kick | {user}")
             return False
+        except (discord.HTTPException, RuntimeError) as e:
+            # NotFound (User weg), 5xx, Action-Scheduler geschlossen
+            logger.error(f"AUTO KICK FAILED | {type(e).__name__}: {e} | {user}")
+            return False
         
         if channel_id:
             await log_to_channel(
@@ -118,7 +133,7 @@ async def handle_auto_actions(*,
                 f"**Warns:** {total_warnings}",
                 discord.Color.orange()
             )
-        mark_auto_action(warning_id, "kick")    
+        await mark_auto_action(warning_id, "kick")    
         logger.info(f"AUTO KICK | {user}")
         return True
 
@@ -129,10 +144,19 @@ async def handle_auto_actions(*,
         
         until = utcnow() + timedelta(seconds=timeout_duration)
         try:
-            await user.timeout(until, reason="Automatischer Timeout durch Verwarnungen")
+            await actions.run(
+                f"members:{user.guild.id}",
+                lambda: user.timeout(until, reason="Automatischer Timeout durch Verwarnungen"),
+                priority=Priority.TIMEOUT,
+                action="auto_timeout",
+            )
         except discord.Forbidden:
             logger.error(f"AUTO TIMEOUT FAILED | Keine Berechtigung zum Timeout | {user}")
             return False
+        except (discord.HTTPException, RuntimeError) as e:
+            # NotFound (User weg), 5xx, Action-Scheduler geschlossen
+            logger.error(f"AUTO TIMEOUT FAILED | {type(e).__name__}: {e} | {user}")
+            return False
         
         if channel_id:
             await log_to_channel(
@@ -143,7 +167,7 @@ async def handle_auto_actions(*,
                 f"**Dauer:** {timeout_duration}s",
                 discord.Color.gold()
             )
-        mark_auto_action(interaction.guild.id, user.id, "timeout")    
+        await mark_auto_action(warning_id, "timeout")    
         logger.info(f"AUTO TIMEOUT | {user}")
         return True
     return False
@@ -0,0 +1,222 @@
+"""
+Hintergrund-Queue für Log-Embeds (Modlog, Bot-Log).
+
+Commands rufen nur log_to_channel() auf -> Embed landet in der Queue,
+der Command läuft sofort weiter. Ein Task auf dem Event-Loop sammelt die
+Embeds pro Channel und schickt bis zu 10 Stück in EINER Nachricht
+(channel.send(embeds=[...])) - geflusht wird bei 10 Embeds / 6000 Zeichen
+oder spätestens nach FLUSH_INTERVAL.
+Bei 429 (Rate Limit) wartet der Dispatcher retry_after ab und versucht es erneut.
+
+Transport: ist in config.yaml unter log_webhooks für den Log-Channel ein
+Webhook eingetragen, geht das Log über den Webhook (eigenes Rate-Limit,
+konkurriert nicht mit Bans/Timeouts des Bots), sonst über channel.send.
+"""
+import asyncio
+import os
+import time
+
+import discord
+
+from utils.channels import channel_resolver
+from utils.config import config
+from utils.http import get_session
+from utils.logger import logger
+
+MAX_EMBEDS = 10            # Discord-Limit pro Nachricht
+MAX_CHARS = 6000           # Discord-Limit: Summe aller Embeds einer Nachricht
+FLUSH_INTERVAL = 1.0       # Sekunden, die ein Embed höchstens wartet
+MAX_QUEUE = 1000           # darüber werden Logs verworfen (Raid-Schutz)
+MAX_RETRIES = 5
+
+
+class ModlogDispatcher:
+    def __init__(
+        self,
+        *,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_queue: int = MAX_QUEUE,
+    ):
+        self._flush_interval = flush_interval
+        self._queue: asyncio.Queue | None = None
+        self._max_queue = max_queue
+        self._task: asyncio.Task | None = None
+        self._bot: discord.Client | None = None
+        self._webhooks: dict[str, discord.Webhook] = {}
+        self._closed = False
+        self.sent = 0
+        self.batches = 0
+        self.dropped = 0
+        self.rate_limited = 0
+
+    # ==================================================
+    # API
+    # ==================================================
+
+    def enqueue(self, bot: discord.Client, channel_id: int, embed: discord.Embed) -> bool:
+        """Embed einreihen. False -> verworfen (Queue voll oder geschlossen)."""
+        if self._closed:
+            return False
+        self._bot = bot
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._max_queue)
+        try:
+            self._queue.put_nowait((channel_id, embed))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"MODLOG | Queue voll ({self._max_queue}), Embed verworfen: {embed.title}")
+            return False
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="modlog-dispatcher")
+        return True
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue_depth(),
+            "sent": self.sent,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "rateLimited": self.rate_limited,
+        }
+
+    async def close(self, timeout: float = 10):
+        """Restliche Embeds senden (Shutdown) - vor bot.close() aufrufen."""
+        self._closed = True
+        if self._task is None:
+            return
+        deadline = time.monotonic() + timeout
+        try:
+            if self._queue is not None:
+                # Volle Queue: warten, bis der Task Platz für das Stop-Signal macht
+                await asyncio.wait_for(self._queue.put(None), timeout)
+            await asyncio.wait_for(self._task, max(0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            logger.warning(f"MODLOG | Shutdown: {self.queue_depth()} Embed(s) nicht mehr gesendet")
+            self._task.cancel()
+        self._webhooks.clear()
+
+    # ==================================================
+    # DISPATCHER-TASK
+    # ==================================================
+
+    async def _run(self):
+        stop = False
+        while not stop:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            pending: dict[int, list[discord.Embed]] = {}
+            pending.setdefault(item[0], []).append(item[1])
+            deadline = time.monotonic() + self._flush_interval
+
+            # Sammeln, bis ein Channel eine volle Nachricht hat oder die Zeit um ist
+            while max(len(embeds) for embeds in pending.values()) < MAX_EMBEDS:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                pending.setdefault(item[0], []).append(item[1])
+
+            for channel_id, embeds in pending.items():
+                for chunk in _chunk(embeds):
+                    await self._send(channel_id, chunk)
+
+    async def _send(self, channel_id: int, embeds: list[discord.Embed]):
+        webhook = self._webhook(channel_id)
+        if webhook is not None:
+            async def send():
+                await webhook.send(embeds=embeds, username="ChaosBot Logger")
+        else:
+            channel = await self._resolve(channel_id)
+            if channel is None:
+                return
+
+            async def send():
+                await channel.send(embeds=embeds)
+
+        for attempt in range(MAX_RETRIES):
+            try:
+                await send()
+            except discord.RateLimited as e:
+                retry_after = e.retry_after
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    logger.warning(f"MODLOG | Senden fehlgeschlagen: {type(e).__name__}: {e}")
+                    if webhook is None and isinstance(e, (discord.NotFound, discord.Forbidden)):
+                        # Channel weg / keine Rechte -> nicht bei jedem Log erneut versuchen
+                        channel_resolver.mark_missing(channel_id)
+                    return
+                retry_after = float(e.response.headers.get("Retry-After", 1)) if e.response else 1.0
+            except Exception as e:
+                logger.warning(f"MODLOG | Senden fehlgeschlagen: {type(e).__name__}: {e}")
+                return
+            else:
+                self.sent += len(embeds)
+                self.batches += 1
+                return
+
+            self.rate_limited += 1
+            logger.warning(f"MODLOG | Rate Limit, warte {retry_after:.1f}s (Versuch {attempt + 1}/{MAX_RETRIES})")
+            await asyncio.sleep(retry_after)
+
+        self.dropped += len(embeds)
+        logger.error(f"MODLOG | {len(embeds)} Embed(s) nach {MAX_RETRIES} Rate Limits verworfen")
+
+    def _webhook(self, channel_id: int) -> discord.Webhook | None:
+        url = webhook_url(channel_id)
+        if not url:
+            return None
+        webhook = self._webhooks.get(url)
+        if webhook is None:
+            webhook = discord.Webhook.from_url(url, session=get_session())
+            self._webhooks[url] = webhook
+        return webhook
+
+    async def _resolve(self, channel_id: int):
+        channel = await channel_resolver.resolve(self._bot, channel_id)
+        if channel is None:
+            self.dropped += 1
+        return channel
+
+
+def webhook_url(channel_id: int) -> str | None:
+    """
+    Webhook für einen Log-Channel aus config.yaml (log_webhooks.<key>,
+    gleicher Key wie in log_channels). "env:NAME" liest die URL aus der .env.
+    """
+    webhooks = config.log_webhooks
+    if not webhooks:
+        return None
+    for key, log_channel_id in config.log_channels.items():
+        if log_channel_id == channel_id and webhooks.get(key):
+            url = webhooks[key]
+            return os.getenv(url[4:]) if url.startswith("env:") else url
+    return None
+
+
+def _chunk(embeds: list[discord.Embed]):
+    """Teilt Embeds in Nachrichten mit max. 10 Embeds / 6000 Zeichen."""
+    chunk, size = [], 0
+    for embed in embeds:
+        length = len(embed)
+        if chunk and (len(chunk) >= MAX_EMBEDS or size + length > MAX_CHARS):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(embed)
+        size += length
+    if chunk:
+        yield chunk
+
+
+# Ein Dispatcher für den ganzen Prozess
+modlog = ModlogDispatcher()
@@ -2,8 +2,9 @@ from enum import IntEnum
 
 class PermLevel(IntEnum):
     MEMBER = 0
-    SUPPORT = 1
-    MOD = 2
-    ADMIN = 3
-    DEV = 4
-    OWNER = 5
+    SUPPORT = 5
+    MOD = 10
+    ADMIN = 20
+    DEV = 30
+    CO_OWNER = 35
+    OWNER = 40
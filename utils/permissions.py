@@ -1,61 +1,92 @@
 import discord
-from enum import IntEnum
+from collections import OrderedDict
+from utils.perm_level import PermLevel
 from utils.config import config
+from utils.policy import get_policy
 
-class PermLevel(IntEnum):
-    MEMBER = 0
-    SUPPORT = 5
-    MOD = 10
-    ADMIN = 20
-    DEV = 30
-    CO_OWNER = 35
-    OWNER = 40
-
-ROLE_TO_LEVEL = {
-    role_id: level
-    for role_id, level in {
-    #MEMBER ROLES
-    config.roles.get("member_1"): PermLevel.MEMBER,
-    config.roles.get("member_2"): PermLevel.MEMBER,
-    config.roles.get("member_3"): PermLevel.MEMBER,
-    config.roles.get("member_4"): PermLevel.MEMBER,
-
-    #Staff ROLES
-    config.roles.get("supporter"): PermLevel.SUPPORT,
-    config.roles.get("moderator"): PermLevel.MOD,
-    config.roles.get("admin"): PermLevel.ADMIN,
-    config.roles.get("dev"): PermLevel.DEV,
-    config.roles.get("owner"): PermLevel.OWNER,
-    config.roles.get("co_owner"): PermLevel.CO_OWNER,
-} .items()
-    if role_id is not None
-}
 
+# ==================================================
+# PERM-LEVEL CACHE
+# ==================================================
+# (guild_id, member_id) -> (policy, Rollen-IDs, level) - Lookup ohne Policy-Auswertung.
+# Aktuell gehalten über Events (cogs/events.py): Rollen des Members geändert
+# -> invalidate_member, Rollen-Rechte / Owner geändert -> clear_perm_cache.
+# Die Rollen-IDs werden bei jedem Treffer verglichen - fehlt ein Event
+# (z.B. ohne Members-Intent), gilt der Eintrag trotzdem nicht weiter.
+# Einträge einer ausgetauschten Policy (swap_policy) gelten als veraltet.
+_PERM_CACHE_MAXSIZE = 5_000
+_perm_cache: OrderedDict = OrderedDict()
+_perm_stats = {"hits": 0, "misses": 0}
 
-def get_user_perm_level(member: discord.Member) -> PermLevel:
+
+def _resolve_perm_level(member: discord.Member, policy) -> PermLevel:
     # Safety-Fallback: Discord-Admin = Owner-Level
-    security_cfg = config.security 
     if (member.guild_permissions.administrator and
-        security_cfg.get("admin_is_owner", False)
-        and not security_cfg.get("owner_role_only", False)
+        policy.admin_is_owner
+        and not policy.owner_role_only
         ):    
         return PermLevel.OWNER
     
     highest = PermLevel.MEMBER
 
     for role in member.roles:
-        level = ROLE_TO_LEVEL.get(role.id)
+        level = policy.role_levels.get(role.id)
         if level and level > highest:
             highest = level
 
     return highest
 
-def get_required_perm_level(action: str) -> PermLevel:
-    perm_cfg = config.permissions.get(action)
-    if not perm_cfg:
-        return PermLevel.DEV 
 
-    return PermLevel(perm_cfg.get("min_level", PermLevel.DEV))
+def get_user_perm_level(member: discord.Member) -> PermLevel:
+    key = (member.guild.id, member.id)
+    policy = get_policy()
+    roles = frozenset(role.id for role in member.roles)
+
+    cached = _perm_cache.get(key)
+    if cached is not None and cached[0] is policy and cached[1] == roles:
+        _perm_cache.move_to_end(key)
+        _perm_stats["hits"] += 1
+        return cached[2]
+
+    _perm_stats["misses"] += 1
+    level = _resolve_perm_level(member, policy)
+    _perm_cache[key] = (policy, roles, level)
+    _perm_cache.move_to_end(key)
+    if len(_perm_cache) > _PERM_CACHE_MAXSIZE:
+        _perm_cache.popitem(last=False)
+    return level
+
+
+def invalidate_member(guild_id: int, member_id: int):
+    _perm_cache.pop((guild_id, member_id), None)
+
+
+def clear_perm_cache(guild_id: int | None = None):
+    """Alle Einträge (oder nur die eines Servers) verwerfen."""
+    if guild_id is None:
+        _perm_cache.clear()
+        return
+    for key in [key for key in _perm_cache if key[0] == guild_id]:
+        del _perm_cache[key]
+
+
+# Neue config.yaml -> alte Einträge gehören zur alten Policy, Speicher freigeben
+config.subscribe(lambda cfg: clear_perm_cache())
+
+
+def perm_cache_stats() -> dict:
+    hits, misses = _perm_stats["hits"], _perm_stats["misses"]
+    total = hits + misses
+    return {
+        "size": len(_perm_cache),
+        "maxsize": _PERM_CACHE_MAXSIZE,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else 0.0,
+    }
+
+def get_required_perm_level(action: str) -> PermLevel:
+    return get_policy().required_level(action)
 
 def has_permission(member: discord.Member, action: str) -> bool:
     return get_user_perm_level(member) >= get_required_perm_level(action)
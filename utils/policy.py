@@ -0,0 +1,89 @@
+"""
+Kompilierte Berechtigungs-Policy aus config.yaml.
+
+Wird einmal gebaut (compile_policy) und als unveränderliches Objekt abgelegt.
+Alle Checks lesen nur noch get_policy() - keine config-Lookups pro Aufruf.
+Neue Config -> neue Policy bauen und mit swap_policy() austauschen; die
+Zuweisung ist atomar, laufende Checks sehen entweder die alte oder die neue.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from utils.config import config
+from utils.perm_level import PermLevel
+
+# Rollen-Key in config.roles -> Level
+ROLE_LEVELS = {
+    "member_1": PermLevel.MEMBER,
+    "member_2": PermLevel.MEMBER,
+    "member_3": PermLevel.MEMBER,
+    "member_4": PermLevel.MEMBER,
+    "supporter": PermLevel.SUPPORT,
+    "moderator": PermLevel.MOD,
+    "admin": PermLevel.ADMIN,
+    "dev": PermLevel.DEV,
+    "owner": PermLevel.OWNER,
+    "co_owner": PermLevel.CO_OWNER,
+}
+
+# Aktionen ohne Eintrag in config.permissions
+DEFAULT_ACTION_LEVEL = PermLevel.DEV
+
+
+@dataclass(frozen=True, slots=True)
+class Policy:
+    role_levels: MappingProxyType       # role_id -> PermLevel
+    action_levels: MappingProxyType     # action -> PermLevel
+    staff_role_ids: frozenset[int]
+    admin_is_owner: bool
+    owner_role_only: bool
+
+    def required_level(self, action: str) -> PermLevel:
+        return self.action_levels.get(action, DEFAULT_ACTION_LEVEL)
+
+
+def compile_policy(cfg=config) -> Policy:
+    roles = cfg.roles
+    role_levels = {}
+    for key, level in ROLE_LEVELS.items():
+        role_id = roles.get(key)
+        if role_id is not None:
+            role_levels[int(role_id)] = level
+
+    action_levels = {
+        action: PermLevel(perm_cfg.get("min_level", DEFAULT_ACTION_LEVEL))
+        for action, perm_cfg in cfg.permissions.items()
+        if perm_cfg
+    }
+
+    staff_role_ids = frozenset(
+        int(roles.get(key))
+        for key in cfg.role_management.get("staff_roles", [])
+        if roles.get(key)
+    )
+
+    security = cfg.security
+    return Policy(
+        role_levels=MappingProxyType(role_levels),
+        action_levels=MappingProxyType(action_levels),
+        staff_role_ids=staff_role_ids,
+        admin_is_owner=bool(security.get("admin_is_owner", False)),
+        owner_role_only=bool(security.get("owner_role_only", False)),
+    )
+
+
+_policy: Policy = compile_policy()
+
+
+def get_policy() -> Policy:
+    return _policy
+
+
+def swap_policy(policy: Policy):
+    global _policy
+    _policy = policy
+
+
+@config.subscribe
+def _recompile_policy(cfg):
+    swap_policy(compile_policy(cfg))
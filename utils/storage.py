@@ -0,0 +1,481 @@
+"""
+Storage-Backends für die Moderationsdaten (Warns, Auto-Aktionen, Punishments).
+
+- SQLiteStore: Standard, nutzt utils.warnings_db (Pool, Batch-Writer, Migrationen)
+- MemoryStore: alles im RAM (dicts + arrays) - für Tests und Benchmarks,
+  nichts wird gespeichert
+
+Auswahl über config.yaml:
+    storage:
+      backend: sqlite   # oder: memory
+
+Cogs und utils/sync.py gehen über utils.async_db, das an get_store() weiterreicht.
+Ein weiteres Backend (z.B. ein DB-Server) muss nur ModerationStore implementieren.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from utils.config import config
+from utils.timestamps import from_ms, now_ms, to_ms
+
+
+class ModerationStore(ABC):
+    """Schnittstelle aller Backends. Alle Datenzugriffe sind awaitbar."""
+
+    name = "abstract"
+
+    def open(self):
+        """Synchron beim Start (vor dem Event-Loop): Schema anlegen/migrieren."""
+
+    def close(self):
+        """Synchron beim Shutdown: ausstehende Writes schreiben, Verbindungen schließen."""
+
+    def cache_stats(self) -> dict:
+        return {}
+
+    # ---- WARNINGS ----
+    @abstractmethod
+    async def add_warning(self, guild_id: int, user_id: int, moderator_id: int, reason: str) -> int: ...
+
+    @abstractmethod
+    async def count_warnings(self, guild_id: int, user_id: int) -> int: ...
+
+    @abstractmethod
+    async def count_warnings_since(self, guild_id: int, user_id: int, since: datetime) -> int: ...
+
+    @abstractmethod
+    async def delete_warnings(self, guild_id: int, user_id: int): ...
+
+    @abstractmethod
+    async def get_last_warning_id(self, guild_id: int, user_id: int) -> int | None: ...
+
+    @abstractmethod
+    async def get_warning_by_id(self, warn_id: int): ...
+
+    @abstractmethod
+    async def get_warning_page(
+        self, guild_id: int, user_id: int, before_id: int | None = None, limit: int = 10
+    ) -> list[dict]: ...
+
+    @abstractmethod
+    async def delete_warning_by_id(self, warn_id: int): ...
+
+    # ---- AUTO-ACTIONS ----
+    @abstractmethod
+    async def get_last_auto_action(self, guild_id: int, user_id: int): ...
+
+    @abstractmethod
+    async def mark_auto_action(self, warning_id: int, action_type: str): ...
+
+    # ---- PUNISHMENTS ----
+    @abstractmethod
+    async def get_punishment(self, guild_id: int, user_id: int): ...
+
+    @abstractmethod
+    async def get_expiring_timeouts(self, before: datetime, limit: int = 500) -> list[dict]: ...
+
+    @abstractmethod
+    async def save_timeout(self, guild_id: int, user_id: int, until: datetime, reason: str | None = None): ...
+
+    @abstractmethod
+    async def save_timeouts(self, guild_id: int, user_ids, until: datetime, reason: str | None = None): ...
+
+    @abstractmethod
+    async def clear_timeout(self, guild_id: int, user_id: int): ...
+
+    @abstractmethod
+    async def get_banned_user_ids(self, guild_id: int) -> set[int]: ...
+
+    @abstractmethod
+    async def get_expiring_bans(self, before: datetime, limit: int = 500) -> list[dict]: ...
+
+    @abstractmethod
+    async def save_ban(
+        self, guild_id: int, user_id: int, reason: str | None = None, until: datetime | None = None
+    ): ...
+
+    @abstractmethod
+    async def save_bans(self, guild_id: int, user_ids, reason: str | None = None): ...
+
+    @abstractmethod
+    async def mark_banned(self, guild_id: int, user_id: int, reason: str | None = None): ...
+
+    @abstractmethod
+    async def clear_ban(self, guild_id: int, user_id: int): ...
+
+    # ---- SNAPSHOT ----
+    @abstractmethod
+    async def get_user_snapshots(self, guild_id: int, user_ids) -> dict[int, dict]: ...
+
+    async def get_user_snapshot(self, guild_id: int, user_id: int) -> dict:
+        return (await self.get_user_snapshots(guild_id, [user_id]))[user_id]
+
+    async def get_user_status(self, guild_id: int, user_id: int):
+        snapshot = await self.get_user_snapshot(guild_id, user_id)
+        return {
+            "warns": snapshot["warns"],
+            "timeout_until": snapshot["timeout_until"],
+            "active_ban": snapshot["active_ban"],
+            "reason": snapshot["reason"],
+        }
+
+    # ---- WARTUNG ----
+    @abstractmethod
+    async def check_user_stats(self, repair: bool = True) -> dict: ...
+
+    @abstractmethod
+    async def archive_old_warnings(self, max_age_days: int, batch_size: int = 500) -> int: ...
+
+    @abstractmethod
+    async def count_archived_warnings(self, guild_id: int, user_id: int) -> int: ...
+
+
+# ==================================================
+# SQLITE
+# ==================================================
+
+# Über den Namen aufgelöst (self._db), damit warnings_db erst mit einem
+# SQLiteStore geladen wird - MemoryStore startet keinen Pool / Writer.
+
+def _threaded(name: str):
+    """Sync-Funktion aus warnings_db im DB-Threadpool ausführen."""
+    async def wrapper(self, *args, **kwargs):
+        from utils.db_executor import run_db
+        return await run_db(getattr(self._db, name), *args, **kwargs)
+    wrapper.__name__ = wrapper.__qualname__ = name
+    return wrapper
+
+
+def _queued(name: str):
+    """queue_*-Funktion aus warnings_db: auf das Future des Batch-Writers warten."""
+    async def wrapper(self, *args, **kwargs):
+        return await asyncio.wrap_future(getattr(self._db, name)(*args, **kwargs))
+    wrapper.__name__ = wrapper.__qualname__ = name
+    return wrapper
+
+
+class SQLiteStore(ModerationStore):
+    """
+    Dünner Adapter um utils.warnings_db:
+    Lesen im DB-Threadpool, Schreiben über den Batch-Writer.
+    """
+
+    name = "sqlite"
+
+    def __init__(self):
+        from utils import warnings_db
+        self._db = warnings_db
+
+    def open(self):
+        self._db.init_db()
+
+    def close(self):
+        from utils.db_executor import shutdown_db_executor
+        # Offene DB-Aufträge abarbeiten, dann Writer flushen + Verbindungen schließen
+        shutdown_db_executor()
+        self._db.close_db()
+
+    def cache_stats(self) -> dict:
+        return {"warnCounts": self._db.warn_cache_stats()}
+
+    # ---- WARNINGS ----
+    add_warning = _queued("queue_add_warning")
+
+    async def count_warnings(self, guild_id: int, user_id: int) -> int:
+        # Cache-Treffer direkt auf dem Loop beantworten, nur Misses gehen an die DB
+        cached = self._db.warn_counts.get((guild_id, user_id))
+        if cached is not None:
+            return cached
+        from utils.db_executor import run_db
+        return await run_db(self._db.count_warnings_uncached, guild_id, user_id)
+
+    count_warnings_since = _threaded("count_warnings_since")
+    delete_warnings = _queued("queue_delete_warnings")
+    get_last_warning_id = _threaded("get_last_warning_id")
+    get_warning_by_id = _threaded("get_warning_by_id")
+    get_warning_page = _threaded("get_warning_page")
+    delete_warning_by_id = _queued("queue_delete_warning_by_id")
+
+    # ---- AUTO-ACTIONS ----
+    get_last_auto_action = _threaded("get_last_auto_action")
+    mark_auto_action = _queued("queue_mark_auto_action")
+
+    # ---- PUNISHMENTS ----
+    get_punishment = _threaded("get_punishment")
+    get_expiring_timeouts = _threaded("get_expiring_timeouts")
+    get_expiring_bans = _threaded("get_expiring_bans")
+    get_banned_user_ids = _threaded("get_banned_user_ids")
+    save_timeout = _queued("queue_save_timeout")
+    save_timeouts = _queued("queue_save_timeouts")
+    clear_timeout = _queued("queue_clear_timeout")
+    save_ban = _queued("queue_save_ban")
+    save_bans = _queued("queue_save_bans")
+    mark_banned = _queued("queue_mark_banned")
+    clear_ban = _queued("queue_clear_ban")
+
+    # ---- SNAPSHOT ----
+    get_user_snapshots = _threaded("get_user_snapshots")
+    get_user_snapshot = _threaded("get_user_snapshot")
+    get_user_status = _threaded("get_user_status")
+
+    # ---- WARTUNG ----
+    check_user_stats = _queued("queue_check_user_stats")
+    archive_old_warnings = _threaded("archive_old_warnings")
+    count_archived_warnings = _threaded("count_archived_warnings")
+
+
+# ==================================================
+# MEMORY
+# ==================================================
+
+@dataclass(slots=True)
+class _Warning:
+    id: int
+    guild_id: int
+    user_id: int
+    moderator_id: int
+    reason: str
+    created_at: int
+    auto_action_type: str | None = None
+    auto_action_at: int | None = None
+
+
+class MemoryStore(ModerationStore):
+    """
+    Reines In-Memory-Backend, gleiche Semantik wie SQLiteStore.
+    Warns liegen in einem dict (id -> _Warning), pro User zusätzlich die IDs
+    aufsteigend in einem array('q') - Zählen ist len(), "letzte ID" ist [-1].
+    Läuft komplett auf dem Event-Loop (keine Threads, keine Locks nötig).
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._next_id = 1
+        self._warnings: dict[int, _Warning] = {}
+        self._by_user: dict[tuple[int, int], array] = {}
+        self._archived: dict[tuple[int, int], int] = {}
+        # (guild_id, user_id) -> [active_timeout_until_ms, active_ban, reason, ban_until_ms]
+        self._punishments: dict[tuple[int, int], list] = {}
+
+    def cache_stats(self) -> dict:
+        return {"warnings": len(self._warnings), "punishments": len(self._punishments)}
+
+    def _ids(self, guild_id: int, user_id: int) -> array:
+        return self._by_user.get((guild_id, user_id)) or array("q")
+
+    def _remove(self, warning: _Warning):
+        ids = self._by_user[(warning.guild_id, warning.user_id)]
+        del ids[bisect_left(ids, warning.id)]
+        del self._warnings[warning.id]
+
+    # ---- WARNINGS ----
+    async def add_warning(self, guild_id, user_id, moderator_id, reason) -> int:
+        warn_id = self._next_id
+        self._next_id += 1
+        self._warnings[warn_id] = _Warning(warn_id, guild_id, user_id, moderator_id, reason, now_ms())
+        self._by_user.setdefault((guild_id, user_id), array("q")).append(warn_id)
+        return warn_id
+
+    async def count_warnings(self, guild_id, user_id) -> int:
+        return len(self._ids(guild_id, user_id))
+
+    async def count_warnings_since(self, guild_id, user_id, since) -> int:
+        since_ms = to_ms(since)
+        return sum(1 for i in self._ids(guild_id, user_id) if self._warnings[i].created_at >= since_ms)
+
+    async def delete_warnings(self, guild_id, user_id):
+        for warn_id in self._by_user.pop((guild_id, user_id), ()):
+            del self._warnings[warn_id]
+
+    async def get_last_warning_id(self, guild_id, user_id):
+        ids = self._ids(guild_id, user_id)
+        return ids[-1] if ids else None
+
+    async def get_warning_by_id(self, warn_id):
+        warning = self._warnings.get(warn_id)
+        return warning.auto_action_type if warning else None
+
+    async def get_warning_page(self, guild_id, user_id, before_id=None, limit=10) -> list[dict]:
+        ids = self._ids(guild_id, user_id)
+        end = len(ids) if before_id is None else bisect_left(ids, before_id)
+        page = []
+        for warn_id in reversed(ids[max(0, end - limit):end]):
+            w = self._warnings[warn_id]
+            page.append({
+                "id": w.id,
+                "moderator_id": w.moderator_id,
+                "reason": w.reason,
+                "created_at": from_ms(w.created_at),
+                "auto_action": (
+                    {"type": w.auto_action_type, "at": from_ms(w.auto_action_at)}
+                    if w.auto_action_at is not None else None
+                ),
+            })
+        return page
+
+    async def delete_warning_by_id(self, warn_id):
+        warning = self._warnings.get(warn_id)
+        if warning:
+            self._remove(warning)
+
+    # ---- AUTO-ACTIONS ----
+    def _last_auto_action(self, guild_id, user_id) -> _Warning | None:
+        last = None
+        for warn_id in self._ids(guild_id, user_id):
+            w = self._warnings[warn_id]
+            if w.auto_action_at is not None and (last is None or w.auto_action_at >= last.auto_action_at):
+                last = w
+        return last
+
+    async def get_last_auto_action(self, guild_id, user_id):
+        last = self._last_auto_action(guild_id, user_id)
+        if last is None:
+            return None
+        return {"type": last.auto_action_type, "at": from_ms(last.auto_action_at)}
+
+    async def mark_auto_action(self, warning_id, action_type):
+        warning = self._warnings.get(warning_id)
+        if warning:
+            warning.auto_action_type = action_type
+            warning.auto_action_at = now_ms()
+
+    # ---- PUNISHMENTS ----
+    async def get_punishment(self, guild_id, user_id):
+        row = self._punishments.get((guild_id, user_id))
+        if row is None:
+            return None
+        return {
+            "active_timeout_until": from_ms(row[0]),
+            "active_ban": bool(row[1]),
+            "ban_until": from_ms(row[3]),
+        }
+
+    def _expiring(self, before, limit, column: int, *, banned: bool = False) -> list[dict]:
+        before_ms = to_ms(before)
+        due = sorted(
+            (row[column], key) for key, row in self._punishments.items()
+            if row[column] is not None and row[column] < before_ms and (row[1] or not banned)
+        )[:limit]
+        return [
+            {"guild_id": guild_id, "user_id": user_id, "until": from_ms(until)}
+            for until, (guild_id, user_id) in due
+        ]
+
+    async def get_expiring_timeouts(self, before, limit=500) -> list[dict]:
+        return self._expiring(before, limit, 0)
+
+    async def get_expiring_bans(self, before, limit=500) -> list[dict]:
+        return self._expiring(before, limit, 3, banned=True)
+
+    async def get_banned_user_ids(self, guild_id) -> set[int]:
+        return {
+            user_id for (g, user_id), row in self._punishments.items()
+            if g == guild_id and row[1]
+        }
+
+    async def save_timeout(self, guild_id, user_id, until, reason=None):
+        row = self._punishments.setdefault((guild_id, user_id), [None, 0, None, None])
+        row[0], row[2] = to_ms(until), reason
+
+    async def save_timeouts(self, guild_id, user_ids, until, reason=None):
+        for user_id in user_ids:
+            await self.save_timeout(guild_id, user_id, until, reason)
+
+    async def clear_timeout(self, guild_id, user_id):
+        row = self._punishments.get((guild_id, user_id))
+        if row:
+            row[0], row[2] = None, None
+
+    async def save_ban(self, guild_id, user_id, reason=None, until=None):
+        row = self._punishments.setdefault((guild_id, user_id), [None, 0, None, None])
+        row[1], row[2], row[3] = 1, reason, to_ms(until)
+
+    async def save_bans(self, guild_id, user_ids, reason=None):
+        for user_id in user_ids:
+            await self.save_ban(guild_id, user_id, reason)
+
+    async def mark_banned(self, guild_id, user_id, reason=None):
+        row = self._punishments.get((guild_id, user_id))
+        if row is None or not row[1]:
+            await self.save_ban(guild_id, user_id, reason)
+
+    async def clear_ban(self, guild_id, user_id):
+        row = self._punishments.get((guild_id, user_id))
+        if row:
+            row[1], row[2], row[3] = 0, None, None
+
+    # ---- SNAPSHOT ----
+    async def get_user_snapshots(self, guild_id, user_ids) -> dict[int, dict]:
+        snapshots = {}
+        for user_id in dict.fromkeys(int(uid) for uid in user_ids):
+            ids = self._ids(guild_id, user_id)
+            last = self._last_auto_action(guild_id, user_id)
+            timeout_until, active_ban, reason, _ = self._punishments.get((guild_id, user_id), (None, 0, None, None))
+            snapshots[user_id] = {
+                "warns": len(ids),
+                "last_warning_id": ids[-1] if ids else None,
+                "last_auto_action": (
+                    {"type": last.auto_action_type, "at": from_ms(last.auto_action_at)}
+                    if last else None
+                ),
+                "timeout_until": from_ms(timeout_until),
+                "active_ban": bool(active_ban),
+                "reason": reason,
+            }
+        return snapshots
+
+    # ---- WARTUNG ----
+    async def check_user_stats(self, repair=True) -> dict:
+        # Aggregate werden hier immer direkt berechnet -> kein Drift möglich
+        return {"drift": 0, "repaired": False}
+
+    async def archive_old_warnings(self, max_age_days, batch_size=500) -> int:
+        if max_age_days <= 0:
+            return 0
+        cutoff = to_ms(datetime.now(timezone.utc) - timedelta(days=max_age_days))
+        old = [w for w in self._warnings.values() if w.created_at < cutoff]
+        for warning in old:
+            key = (warning.guild_id, warning.user_id)
+            self._archived[key] = self._archived.get(key, 0) + 1
+            self._remove(warning)
+        return len(old)
+
+    async def count_archived_warnings(self, guild_id, user_id) -> int:
+        return self._archived.get((guild_id, user_id), 0)
+
+
+# ==================================================
+# AUSWAHL
+# ==================================================
+
+BACKENDS = {
+    "sqlite": SQLiteStore,
+    "memory": MemoryStore,
+}
+
+_store: ModerationStore | None = None
+
+
+def create_store(backend: str | None = None) -> ModerationStore:
+    backend = (backend or config.storage.get("backend", "sqlite")).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"❌ Unbekanntes Storage-Backend in config.yaml: {backend}")
+    return BACKENDS[backend]()
+
+
+def get_store() -> ModerationStore:
+    global _store
+    if _store is None:
+        _store = create_store()
+    return _store
+
+
+def set_store(store: ModerationStore):
+    """Backend austauschen (Tests/Benchmarks)."""
+    global _store
+    _store = store
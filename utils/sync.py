@@ -1,12 +1,77 @@
+import asyncio
+import time
 import discord
+from dataclasses import dataclass, field
 from datetime import datetime
 from discord.utils import utcnow
-from utils.warnings_db import (
+from utils.action_scheduler import Priority, actions as scheduler
+from utils.async_db import (
+    get_banned_user_ids,
     get_user_status,
+    get_user_snapshots,
     save_timeout,
     clear_timeout,
-    save_ban,
+    save_bans,
 )
+from utils.bans import ban_index
+from utils.mass_actions import MASS_CONCURRENCY
+
+# Member pro Snapshot-Query beim Gilden-Sync
+SYNC_CHUNK_SIZE = 500
+# Wie viele Korrekturen im Report-Embed aufgelistet werden
+REPORT_DETAIL_LINES = 15
+
+
+@dataclass
+class _Fix:
+    """Eine Korrektur: Beschreibung + Coroutine-Factory (Discord-Call oder DB-Write)."""
+    description: str
+    apply: object
+    discord: bool = True
+
+
+def _reapply_timeout(guild: discord.Guild, member: discord.Member, until: datetime):
+    return lambda: scheduler.run(
+        f"members:{guild.id}",
+        lambda: member.timeout(until, reason="Sync: DB → Discord"),
+        priority=Priority.TIMEOUT,
+        action="sync_timeout",
+    )
+
+
+def _reapply_ban(guild: discord.Guild, target: discord.abc.Snowflake):
+    return lambda: scheduler.run(
+        f"bans:{guild.id}",
+        lambda: guild.ban(target, reason="Sync: DB → Discord (Bann aktiv)"),
+        priority=Priority.BAN,
+        action="sync_ban",
+    )
+
+
+def _timeout_fix(guild: discord.Guild, member: discord.Member, db_timeout: datetime | None, now) -> _Fix | None:
+    """Timeout-Abgleich für einen Member (gleiche Regeln für /sync_user und Gilden-Sync)."""
+    discord_timeout = member.is_timed_out()
+
+    # DB -> Discord
+    if db_timeout and not discord_timeout:
+        if db_timeout > now:
+            return _Fix("Timeout aus DB erneut gesetzt", _reapply_timeout(guild, member, db_timeout))
+        # Abgelaufen, aber noch in der DB
+        return _Fix(
+            "Abgelaufenen Timeout aus DB entfernt",
+            lambda: clear_timeout(guild.id, member.id),
+            discord=False,
+        )
+
+    # Discord -> DB
+    if discord_timeout and not db_timeout:
+        return _Fix(
+            "Timeout aus Discord in DB gespeichert",
+            lambda: save_timeout(guild.id, member.id, member.timed_out_until),
+            discord=False,
+        )
+    return None
+
 
 async def sync_user_state(
     guild: discord.Guild,
@@ -17,32 +82,190 @@ async def sync_user_state(
     Returns: Liste der durchgeführten Aktionen (Strings)
     """
     actions = []
-    status = get_user_status(guild.id, member.id)
+    status = await get_user_status(guild.id, member.id)
 
     # ---- TIMEOUT ----
-    db_timeout = status["timeout_until"]
-    discord_timeout = member.is_timed_out()
-
-    # DB -> Discord
-    if db_timeout and not discord_timeout:
-        if db_timeout > utcnow():
-            await member.timeout(db_timeout, reason="Sync: DB → Discord")
-            actions.append("Timeout aus DB erneut gesetzt")
-
-    # Discord -> DB
-    if discord_timeout and not db_timeout:
-        save_timeout(guild.id, member.id, member.timed_out_until)
-        actions.append("Timeout aus Discord in DB gespeichert")
+    fix = _timeout_fix(guild, member, status["timeout_until"], utcnow())
+    if fix is not None:
+        await fix.apply()
+        actions.append(fix.description)
 
     # ---- BAN ----
     if status["active_ban"]:
-        try:
-            await guild.fetch_ban(member)
-        except discord.NotFound:
-            await guild.ban(
-                member,
-                reason="Sync: DB → Discord (Bann aktiv)"
-            )
+        banned = ban_index.is_banned(guild.id, member.id)
+        if banned is None:
+            # Gilde nicht indiziert -> einzeln bei Discord nachfragen
+            try:
+                await guild.fetch_ban(member)
+                banned = True
+            except discord.NotFound:
+                banned = False
+        if not banned:
+            await _reapply_ban(guild, member)()
             actions.append("Bann aus DB erneut gesetzt")
 
     return actions
+
+
+# ==================================================
+# GILDEN-SYNC
+# ==================================================
+
+@dataclass
+class SyncReport:
+    guild_id: int
+    dry_run: bool
+    members: int = 0
+    discord_bans: int = 0
+    db_bans: int = 0
+    # "Beschreibung: `user_id`" - im Dry-Run die geplanten Korrekturen
+    applied: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    # Nur in der DB gebannt, mit reapply_bans=False nicht erneut gesetzt
+    db_only: list[int] = field(default_factory=list)
+    notes: list[str] = field(default_factory=list)
+    duration_ms: float = 0.0
+
+    def build_embed(self) -> discord.Embed:
+        title = "🔄 Gilden-Sync (Dry-Run)" if self.dry_run else "🔄 Gilden-Sync"
+        color = discord.Color.orange() if self.applied or self.failed or self.db_only else discord.Color.green()
+        embed = discord.Embed(title=title, color=color, timestamp=utcnow())
+        embed.add_field(
+            name="Geprüft",
+            value=(
+                f"**Member:** {self.members}\n"
+                f"**Banns Discord:** {self.discord_bans}\n"
+                f"**Banns DB:** {self.db_bans}"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="Ergebnis",
+            value=(
+                f"**{'Geplant' if self.dry_run else 'Korrigiert'}:** {len(self.applied)}\n"
+                f"**Fehlgeschlagen:** {len(self.failed)}\n"
+                f"**Dauer:** {self.duration_ms / 1000:.1f}s"
+            ),
+            inline=False
+        )
+        if self.db_only:
+            shown = [f"`{uid}`" for uid in self.db_only[:REPORT_DETAIL_LINES]]
+            if len(self.db_only) > len(shown):
+                shown.append(f"... und {len(self.db_only) - len(shown)} weitere")
+            embed.add_field(
+                name="Nur in DB gebannt (nicht erneut gesetzt)",
+                value="\n".join(shown)[:1024],
+                inline=False
+            )
+        lines = self.failed + self.applied
+        if lines:
+            shown = lines[:REPORT_DETAIL_LINES]
+            if len(lines) > len(shown):
+                shown.append(f"... und {len(lines) - len(shown)} weitere")
+            embed.add_field(name="Details", value="\n".join(shown)[:1024], inline=False)
+        if self.notes:
+            embed.add_field(name="Hinweise", value="\n".join(self.notes)[:1024], inline=False)
+        return embed
+
+
+async def _member_chunks(guild: discord.Guild, size: int):
+    """Member in Blöcken - aus dem Cache, sonst paginiert per REST (braucht den Members-Intent)."""
+    if guild.chunked:
+        members = guild.members
+        for start in range(0, len(members), size):
+            yield members[start:start + size]
+        return
+
+    chunk = []
+    async for member in guild.fetch_members(limit=None):
+        chunk.append(member)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def sync_guild(
+    guild: discord.Guild,
+    *,
+    dry_run: bool = False,
+    reapply_bans: bool = True,
+    limit: int = MASS_CONCURRENCY,
+) -> SyncReport:
+    """
+    Gleicht die ganze Gilde ab: Bannliste einmal paginiert holen, Member in
+    Blöcken gegen eine Snapshot-Query pro Block prüfen, Korrekturen mit
+    begrenzter Parallelität ausführen. dry_run=True ändert nichts.
+    reapply_bans=False (unbeaufsichtigter Lauf) meldet Banns, die nur in der
+    DB stehen, statt sie erneut zu setzen.
+    """
+    start = time.perf_counter()
+    report = SyncReport(guild_id=guild.id, dry_run=dry_run)
+    now = utcnow()
+    fixes: list[tuple[int, _Fix]] = []
+
+    # ---- BAN ----
+    # Über den Bann-Index paginieren: Ban/Unban-Events während des Abrufs
+    # werden gepuffert und eingerechnet
+    await ban_index.build(guild)
+    discord_bans = set(ban_index.banned(guild.id))
+    db_bans = await get_banned_user_ids(guild.id)
+    report.discord_bans, report.db_bans = len(discord_bans), len(db_bans)
+
+    for user_id in sorted(db_bans - discord_bans):
+        if not reapply_bans:
+            report.db_only.append(user_id)
+            continue
+        target = guild.get_member(user_id) or discord.Object(id=user_id)
+        fixes.append((user_id, _Fix("Bann aus DB erneut gesetzt", _reapply_ban(guild, target))))
+
+    # Bei Discord gebannt, in der DB nicht -> ein Sammel-Write
+    missing = sorted(discord_bans - db_bans)
+    if missing:
+        report.applied += [f"Bann aus Discord in DB gespeichert: `{uid}`" for uid in missing]
+        if not dry_run:
+            await save_bans(guild.id, missing, "Sync: Discord → DB")
+
+    # ---- TIMEOUT ----
+    try:
+        async for chunk in _member_chunks(guild, SYNC_CHUNK_SIZE):
+            report.members += len(chunk)
+            snapshots = await get_user_snapshots(guild.id, [member.id for member in chunk])
+            for member in chunk:
+                fix = _timeout_fix(guild, member, snapshots[member.id]["timeout_until"], now)
+                if fix is not None:
+                    fixes.append((member.id, fix))
+    except discord.ClientException as e:
+        # fetch_members ohne Members-Intent -> Banns trotzdem abgleichen
+        report.notes.append(f"Timeout-Abgleich übersprungen: {e}")
+
+    if dry_run:
+        report.applied += [f"{fix.description}: `{uid}`" for uid, fix in fixes]
+        report.duration_ms = (time.perf_counter() - start) * 1000
+        return report
+
+    # DB-Korrekturen direkt, Discord-Calls begrenzt parallel über den Action-Scheduler
+    semaphore = asyncio.Semaphore(limit)
+
+    async def apply(user_id: int, fix: _Fix):
+        try:
+            if fix.discord:
+                async with semaphore:
+                    await fix.apply()
+            else:
+                await fix.apply()
+        except discord.HTTPException as e:
+            report.failed.append(f"{fix.description}: `{user_id}` ({e.status} {e.text or type(e).__name__})")
+        except Exception as e:
+            # z.B. DB-Fehler oder geschlossener Scheduler - nicht die ganze TaskGroup abbrechen
+            report.failed.append(f"{fix.description}: `{user_id}` ({type(e).__name__}: {e})")
+        else:
+            report.applied.append(f"{fix.description}: `{user_id}`")
+
+    async with asyncio.TaskGroup() as tg:
+        for user_id, fix in fixes:
+            tg.create_task(apply(user_id, fix))
+
+    report.duration_ms = (time.perf_counter() - start) * 1000
+    return report
@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+
+# Einheitliches Zeitformat der DB: INTEGER Millisekunden seit Epoch (UTC).
+# Umrechnung passiert NUR hier - der Rest des Bots sieht aware datetimes (UTC).
+
+
+def now_ms() -> int:
+    return to_ms(datetime.now(timezone.utc))
+
+
+def to_ms(dt: datetime | None) -> int | None:
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        # Alte Werte (datetime.utcnow) sind naiv, aber immer UTC gemeint
+        dt = dt.replace(tzinfo=timezone.utc)
+    return round(dt.timestamp() * 1000)
+
+
+def from_ms(ms: int | None) -> datetime | None:
+    if ms is None:
+        return None
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+def iso_to_ms(value) -> int | None:
+    """ISO-Text (alte DB / Export) -> ms. Zahlen werden durchgereicht."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    value = str(value).strip()
+    if value.lstrip("-").isdigit():
+        return int(value)
+    return to_ms(datetime.fromisoformat(value))
+
+
+def ms_to_iso(ms: int | None) -> str | None:
+    dt = from_ms(ms)
+    return dt.isoformat() if dt else None
@@ -0,0 +1,109 @@
+import discord
+
+from discord.utils import format_dt, utcnow
+from utils.async_db import get_warning_page
+
+WARNINGS_PER_PAGE = 5
+# Discord-Limits: 1024 Zeichen pro Feldwert, 6000 pro Embed
+MAX_REASON_CHARS = 700
+MAX_FIELD_CHARS = 1024
+MAX_EMBED_CHARS = 6000
+
+
+class WarningHistoryView(discord.ui.View):
+    """
+    Blättern durch die Verwarnungen eines Users (neueste zuerst).
+    Seiten werden erst beim Klick geladen (Keyset: before_id = letzte ID der
+    vorherigen Seite). Für "Zurück" merken wir uns die Cursor der besuchten Seiten.
+    """
+
+    def __init__(self, author_id: int, guild_id: int, user: discord.Member, total: int, *, timeout: float = 180):
+        super().__init__(timeout=timeout)
+        self.author_id = author_id
+        self.guild_id = guild_id
+        self.user = user
+        self.total = total
+        self.message: discord.Message | None = None
+        # before_id je besuchter Seite; None = erste Seite
+        self._cursors: list[int | None] = [None]
+        self._rows: list[dict] = []
+        self._has_next = False
+
+    async def load(self):
+        """Aktuelle Seite laden (eine Zeile mehr, um zu wissen, ob es weitergeht)."""
+        rows = await get_warning_page(
+            self.guild_id, self.user.id, before_id=self._cursors[-1], limit=WARNINGS_PER_PAGE + 1
+        )
+        self._has_next = len(rows) > WARNINGS_PER_PAGE
+        self._rows = rows[:WARNINGS_PER_PAGE]
+        self.prev_page.disabled = len(self._cursors) == 1
+        self.next_page.disabled = not self._has_next
+
+    def build_embed(self) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"📜 Verwarnungen: {self.user}",
+            description=f"{self.user.mention} hat {self.total} Verwarnung(en).",
+            color=discord.Color.orange(),
+            timestamp=utcnow()
+        )
+        # Footer wird erst am Ende gesetzt -> dafür Platz freihalten
+        budget = MAX_EMBED_CHARS - len(embed) - 50
+        for shown, row in enumerate(self._rows):
+            reason = row["reason"] or "Kein Grund angegeben"
+            if len(reason) > MAX_REASON_CHARS:
+                reason = reason[:MAX_REASON_CHARS - 1] + "…"
+            lines = [
+                f"**Moderator:** <@{row['moderator_id']}>",
+                f"**Grund:** {reason}",
+                f"**Datum:** {format_dt(row['created_at'], style='F')}",
+            ]
+            if row["auto_action"]:
+                lines.append(
+                    f"**Auto-Aktion:** {row['auto_action']['type']} "
+                    f"({format_dt(row['auto_action']['at'], style='R')})"
+                )
+            name, value = f"#{row['id']}", "\n".join(lines)[:MAX_FIELD_CHARS]
+            if len(name) + len(value) > budget:
+                embed.add_field(
+                    name="…",
+                    value=f"{len(self._rows) - shown} weitere auf dieser Seite (zu lang für ein Embed)",
+                    inline=False
+                )
+                break
+            budget -= len(name) + len(value)
+            embed.add_field(name=name, value=value, inline=False)
+
+        if not self._rows:
+            embed.add_field(name="Keine Einträge", value="-", inline=False)
+
+        embed.set_footer(text=f"Seite {len(self._cursors)}")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("❌ Nur der Aufrufer kann blättern.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="◀ Zurück", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if len(self._cursors) > 1:
+            self._cursors.pop()
+        await self.load()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="Weiter ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self._has_next and self._rows:
+            self._cursors.append(self._rows[-1]["id"])
+        await self.load()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    async def on_timeout(self):
+        self.prev_page.disabled = True
+        self.next_page.disabled = True
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
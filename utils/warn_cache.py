@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+
+# Max. Anzahl gecachter (guild_id, user_id)-Zähler (LRU)
+DEFAULT_MAXSIZE = 50_000
+
+
+class CounterCache:
+    """
+    Begrenzter LRU-Cache für Zähler (z.B. Verwarnungen pro User).
+
+    Exaktheit:
+    - Schreibzugriffe setzen den Zähler (set/invalidate) erst NACH dem
+      COMMIT (BatchWriter.after_commit) und erhöhen dabei eine Generation.
+    - Ein Lazy-Load aus der DB merkt sich vorher die Generation (begin_load)
+      und wird in store() verworfen, falls inzwischen geschrieben wurde.
+      So kann kein veralteter DB-Wert einen neueren Stand überschreiben.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> int | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def begin_load(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def store(self, key, value: int, token: int):
+        with self._lock:
+            if token != self._generation:
+                return
+            self._put(key, value)
+
+    def adjust(self, key, delta: int):
+        """Zähler ändern - nur wenn der Key gecacht ist (sonst lädt der nächste Read)."""
+        with self._lock:
+            self._generation += 1
+            value = self._data.get(key)
+            if value is not None:
+                self._put(key, max(0, value + delta))
+
+    def set(self, key, value: int):
+        with self._lock:
+            self._generation += 1
+            self._put(key, value)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def _put(self, key, value: int):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
@@ -1,102 +1,160 @@
-import sqlite3
-from pathlib import Path
-from datetime import datetime
+import json
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import Future
+from utils.config import CONFIG_PATH, config
+from utils.db_pool import ConnectionPool
+from utils.db_writer import BatchWriter
+from utils.migrations import run_migrations, rebuild_user_stats, verify_user_stats
+from utils.warn_cache import CounterCache
+from utils.timestamps import from_ms, iso_to_ms, ms_to_iso, now_ms, to_ms
 
-DB_PATH = Path("data/warnings.db")
+# Relativ zum Bot-Verzeichnis (nicht zum aktuellen Arbeitsverzeichnis)
+DB_PATH = CONFIG_PATH.parent / config.storage.get("path", "data/warnings.db")
 
+# Ein Pool für den ganzen Prozess: 1 Writer + Reader (statt connect() pro Query)
+pool = ConnectionPool(DB_PATH, readers=4)
+# Verwarnungen pro (guild_id, user_id) - wird von den Write-Ops exakt mitgeführt
+warn_counts = CounterCache()
+# Alle Schreibzugriffe laufen gebündelt über den Writer-Thread
+writer = BatchWriter(pool, on_failure=warn_counts.clear)
 
-def get_connection():
-    DB_PATH.parent.mkdir(exist_ok=True)
-    return sqlite3.connect(DB_PATH)
+
+def close_db():
+    # Erst ausstehende Writes committen, dann Verbindungen schließen
+    writer.close()
+    pool.close()
 
 
 # ==================================================
 # INIT / MIGRATION
 # ==================================================
 
-def init_db():
-    with get_connection() as conn:
-
-        # ---- WARNINGS ----
-        conn.execute("""
-        CREATE TABLE IF NOT EXISTS warnings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            moderator_id INTEGER NOT NULL,
-            reason TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            auto_action_type TEXT,
-            auto_action_at TEXT
-        )
-        """)
-
-        # ---- MIGRATION CHECK ----
-        cur = conn.execute("PRAGMA table_info(warnings)")
-        cols = {row[1] for row in cur.fetchall()}
-
-        if "auto_action_type" not in cols:
-            conn.execute("ALTER TABLE warnings ADD COLUMN auto_action_type TEXT")
-
-        if "auto_action_at" not in cols:
-            conn.execute("ALTER TABLE warnings ADD COLUMN auto_action_at TEXT")
-
-        # ---- PUNISHMENTS ----
-        conn.execute("""
-        CREATE TABLE IF NOT EXISTS punishments (
-            guild_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            active_timeout_until TEXT,
-            active_ban INTEGER DEFAULT 0,
-            reason TEXT,
-            PRIMARY KEY (guild_id, user_id)
-        )
-        """)
+def init_db() -> int:
+    """Legt Tabellen/Indizes an bzw. migriert eine bestehende DB (siehe utils.migrations)."""
+    return run_migrations(pool)
+
+
+def _repair_user_stats(conn, repair: bool) -> dict:
+    drift = verify_user_stats(conn)
+    if drift and repair:
+        rebuild_user_stats(conn)
+        writer.after_commit(warn_counts.clear)
+    return {"drift": drift, "repaired": bool(drift and repair)}
+
+
+def queue_check_user_stats(repair: bool = True) -> Future:
+    """
+    Vergleicht user_stats mit warnings und baut die Tabelle bei Drift neu auf.
+    Das Future liefert {"drift": Anzahl abweichender User, "repaired": bool}.
+    Läuft über den Writer, damit währenddessen keine Warns dazwischenkommen.
+    """
+    return writer.submit(_repair_user_stats, repair)
+
+
+def check_user_stats(repair: bool = True) -> dict:
+    return queue_check_user_stats(repair).result()
 
 
 # ==================================================
 # WARNINGS
 # ==================================================
 
+def _refresh_count(conn, guild_id, user_id):
+    """
+    Neuen Zähler in der Transaktion lesen, Cache erst nach dem COMMIT setzen.
+    Vorher würde ein paralleler Lazy-Load (alter WAL-Snapshot) den alten Wert
+    mit gültigem Token cachen; set() nach dem COMMIT verwirft solche Loads.
+    """
+    row = conn.execute(
+        "SELECT warn_count FROM user_stats WHERE guild_id = ? AND user_id = ?",
+        (guild_id, user_id)
+    ).fetchone()
+    writer.after_commit(warn_counts.set, (guild_id, user_id), row[0] if row else 0)
+
+
+def _insert_warning(conn, guild_id, user_id, moderator_id, reason, created_at) -> int:
+    cur = conn.execute(
+        """
+        INSERT INTO warnings (guild_id, user_id, moderator_id, reason, created_at)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        (guild_id, user_id, moderator_id, reason, created_at)
+    )
+    _refresh_count(conn, guild_id, user_id)
+    return cur.lastrowid
+
+
+def queue_add_warning(guild_id: int, user_id: int, moderator_id: int, reason: str) -> Future:
+    """Reiht die Verwarnung ein. Das Future liefert nach dem Commit die Warn-ID."""
+    return writer.submit(
+        _insert_warning, guild_id, user_id, moderator_id, reason, now_ms()
+    )
+
+
 def add_warning(guild_id: int, user_id: int, moderator_id: int, reason: str) -> int:
-    with get_connection() as conn:
-        cur = conn.execute(
-            """
-            INSERT INTO warnings (guild_id, user_id, moderator_id, reason, created_at)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (guild_id, user_id, moderator_id, reason, datetime.utcnow().isoformat())
-        )
-        return cur.lastrowid
+    return queue_add_warning(guild_id, user_id, moderator_id, reason).result()
 
 
 def count_warnings(guild_id: int, user_id: int) -> int:
-    with get_connection() as conn:
+    cached = warn_counts.get((guild_id, user_id))
+    if cached is not None:
+        return cached
+    return count_warnings_uncached(guild_id, user_id)
+
+
+def count_warnings_uncached(guild_id: int, user_id: int) -> int:
+    """Zählt in der DB und wärmt damit den Cache (ohne Cache-Lookup vorher)."""
+    token = warn_counts.begin_load()
+    with pool.read() as conn:
         cur = conn.execute(
-            "SELECT COUNT(*) FROM warnings WHERE guild_id = ? AND user_id = ?",
+            "SELECT warn_count FROM user_stats WHERE guild_id = ? AND user_id = ?",
             (guild_id, user_id)
         )
-        return cur.fetchone()[0]
-    
-def delete_warnings(guild_id: int, user_id: int):
-    with get_connection() as conn:
-        conn.execute(
+        row = cur.fetchone()
+        count = row[0] if row else 0
+    warn_counts.store((guild_id, user_id), count, token)
+    return count
+
+
+def warn_cache_stats() -> dict:
+    return warn_counts.stats()
+
+
+def count_warnings_since(guild_id: int, user_id: int, since: datetime) -> int:
+    """Verwarnungen ab Zeitpunkt `since` (Range-Scan auf idx_warnings_user_created)."""
+    with pool.read() as conn:
+        cur = conn.execute(
             """
-            DELETE FROM warnings
-            WHERE guild_id = ? AND user_id = ?
+            SELECT COUNT(*) FROM warnings
+            WHERE guild_id = ? AND user_id = ? AND created_at >= ?
             """,
-            (guild_id, user_id)
+            (guild_id, user_id, to_ms(since))
         )
+        return cur.fetchone()[0]
+
+
+def _delete_user_warnings(conn, guild_id, user_id):
+    conn.execute(
+        """
+        DELETE FROM warnings
+        WHERE guild_id = ? AND user_id = ?
+        """,
+        (guild_id, user_id)
+    )
+    writer.after_commit(warn_counts.set, (guild_id, user_id), 0)
+
+
+def queue_delete_warnings(guild_id: int, user_id: int) -> Future:
+    return writer.submit(_delete_user_warnings, guild_id, user_id)
+
+
+def delete_warnings(guild_id: int, user_id: int):
+    queue_delete_warnings(guild_id, user_id).result()
 
 def get_last_warning_id(guild_id: int, user_id: int) -> int | None:
-    with get_connection() as conn:
+    with pool.read() as conn:
         cur = conn.execute(
-            """
-            SELECT id FROM warnings
-            WHERE guild_id = ? AND user_id = ?
-            ORDER BY id DESC
-            LIMIT 1
-            """,
+            "SELECT last_warn_id FROM user_stats WHERE guild_id = ? AND user_id = ?",
             (guild_id, user_id)
         )
         row = cur.fetchone()
@@ -104,7 +162,7 @@ def get_last_warning_id(guild_id: int, user_id: int) -> int | None:
 
 
 def get_warning_by_id(warn_id: int):
-    with get_connection() as conn:
+    with pool.read() as conn:
         cur = conn.execute(
             "SELECT auto_action_type FROM warnings WHERE id = ?",
             (warn_id,)
@@ -113,9 +171,59 @@ def get_warning_by_id(warn_id: int):
         return row[0] if row else None
 
 
+# Größer als jede Warn-ID -> erste Seite ohne eigenes Statement
+_MAX_ID = 2**63 - 1
+
+
+def get_warning_page(guild_id: int, user_id: int, before_id: int | None = None, limit: int = 10) -> list[dict]:
+    """
+    Eine Seite Verwarnungen, neueste zuerst (Keyset statt OFFSET).
+    Nächste Seite: before_id = id der letzten Zeile. Kosten pro Seite bleiben
+    konstant - Range-Scan rückwärts auf idx_warnings_user (guild_id, user_id, id).
+    """
+    with pool.read() as conn:
+        rows = conn.execute(
+            """
+            SELECT id, moderator_id, reason, created_at, auto_action_type, auto_action_at
+            FROM warnings
+            WHERE guild_id = ? AND user_id = ? AND id < ?
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (guild_id, user_id, before_id if before_id is not None else _MAX_ID, limit)
+        ).fetchall()
+
+    return [
+        {
+            "id": warn_id,
+            "moderator_id": moderator_id,
+            "reason": reason,
+            "created_at": from_ms(created_at),
+            "auto_action": (
+                {"type": action_type, "at": from_ms(action_at)}
+                if action_at is not None else None
+            ),
+        }
+        for warn_id, moderator_id, reason, created_at, action_type, action_at in rows
+    ]
+
+
+def _delete_warning(conn, warn_id):
+    cur = conn.execute(
+        "DELETE FROM warnings WHERE id = ? RETURNING guild_id, user_id",
+        (warn_id,)
+    )
+    row = cur.fetchone()
+    if row:
+        _refresh_count(conn, row[0], row[1])
+
+
+def queue_delete_warning_by_id(warn_id: int) -> Future:
+    return writer.submit(_delete_warning, warn_id)
+
+
 def delete_warning_by_id(warn_id: int):
-    with get_connection() as conn:
-        conn.execute("DELETE FROM warnings WHERE id = ?", (warn_id,))
+    queue_delete_warning_by_id(warn_id).result()
 
 
 # ==================================================
@@ -123,47 +231,46 @@ def delete_warning_by_id(warn_id: int):
 # ==================================================
 
 def get_last_auto_action(guild_id: int, user_id: int):
-    with get_connection() as conn:
+    with pool.read() as conn:
         cur = conn.execute(
             """
-            SELECT auto_action_type, auto_action_at
-            FROM warnings
-            WHERE guild_id = ?
-              AND user_id = ?
-              AND auto_action_at IS NOT NULL
-            ORDER BY auto_action_at DESC
-            LIMIT 1
+            SELECT last_auto_action_type, last_auto_action_at
+            FROM user_stats
+            WHERE guild_id = ? AND user_id = ?
             """,
             (guild_id, user_id)
         )
         row = cur.fetchone()
 
-    if not row:
+    if not row or row[1] is None:
         return None
 
     action_type, action_at = row
     return {
         "type": action_type,
-        "at": datetime.fromisoformat(action_at)
+        "at": from_ms(action_at)
     }
 
 
-def mark_auto_action(warning_id: int, action_type: str):
-    with get_connection() as conn:
-        conn.execute(
-            """
-            UPDATE warnings
-            SET auto_action_type = ?, auto_action_at = ?
-            WHERE id = ?
-            """,
-            (action_type, datetime.utcnow().isoformat(), warning_id)
-        )
+def _update_auto_action(conn, warning_id, action_type, action_at):
+    conn.execute(
+        """
+        UPDATE warnings
+        SET auto_action_type = ?, auto_action_at = ?
+        WHERE id = ?
+        """,
+        (action_type, action_at, warning_id)
+    )
+
 
+def queue_mark_auto_action(warning_id: int, action_type: str) -> Future:
+    return writer.submit(
+        _update_auto_action, warning_id, action_type, now_ms()
+    )
 
-def auto_action_allowed(last_action, cooldown_seconds: int) -> bool:
-    if not last_action:
-        return True
-    return (datetime.utcnow() - last_action["at"]).total_seconds() >= cooldown_seconds
+
+def mark_auto_action(warning_id: int, action_type: str):
+    queue_mark_auto_action(warning_id, action_type).result()
 
 
 # ==================================================
@@ -171,10 +278,10 @@ def auto_action_allowed(last_action, cooldown_seconds: int) -> bool:
 # ==================================================
 
 def get_punishment(guild_id: int, user_id: int):
-    with get_connection() as conn:
+    with pool.read() as conn:
         cur = conn.execute(
             """
-            SELECT active_timeout_until, active_ban
+            SELECT active_timeout_until, active_ban, ban_until
             FROM punishments
             WHERE guild_id = ? AND user_id = ?
             """,
@@ -185,96 +292,488 @@ def get_punishment(guild_id: int, user_id: int):
     if not row:
         return None
 
-    timeout_until, active_ban = row
+    timeout_until, active_ban, ban_until = row
     return {
-        "active_timeout_until": (
-            datetime.fromisoformat(timeout_until)
-            if timeout_until else None
-        ),
+        "active_timeout_until": from_ms(timeout_until),
         "active_ban": bool(active_ban),
+        "ban_until": from_ms(ban_until),
     }
 
-def save_timeout(guild_id: int, user_id: int, until: datetime, reason: str | None = None):
-    with get_connection() as conn:
-        conn.execute(
-            """
-            INSERT INTO punishments (guild_id, user_id, active_timeout_until, reason)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(guild_id, user_id)
-            DO UPDATE SET active_timeout_until = excluded.active_timeout_until, reason = excluded.reason
-            """,
-            (guild_id, user_id, until.isoformat(), reason)
-            )
-            
-def clear_timeout(guild_id: int, user_id: int):
-    with get_connection() as conn:
-        conn.execute(
+def get_expiring_timeouts(before: datetime, limit: int = 500) -> list[dict]:
+    """Aktive Timeouts, die vor `before` ablaufen - früheste zuerst (Partial-Index)."""
+    with pool.read() as conn:
+        rows = conn.execute(
             """
-            UPDATE punishments
-            SET active_timeout_until = NULL,
-                reason = NULL
-            WHERE guild_id = ? AND user_id = ?
+            SELECT guild_id, user_id, active_timeout_until
+            FROM punishments
+            WHERE active_timeout_until IS NOT NULL
+              AND active_timeout_until < ?
+            ORDER BY active_timeout_until
+            LIMIT ?
             """,
-            (guild_id, user_id)
-        )
+            (to_ms(before), limit)
+        ).fetchall()
+
+    return [
+        {"guild_id": guild_id, "user_id": user_id, "until": from_ms(until)}
+        for guild_id, user_id, until in rows
+    ]
 
-def save_ban(guild_id: int, user_id: int, reason: str | None = None):
-    print(">>>SAVE_BAN_CALLED<<<", guild_id, user_id, reason)
-    with get_connection() as conn:
-        conn.execute(
+
+def get_banned_user_ids(guild_id: int) -> set[int]:
+    """Alle User mit aktivem Bann in der DB (Gilden-Sync) - Bereichs-Scan über den PK."""
+    with pool.read() as conn:
+        rows = conn.execute(
+            "SELECT user_id FROM punishments WHERE guild_id = ? AND active_ban = 1",
+            (guild_id,)
+        ).fetchall()
+    return {user_id for (user_id,) in rows}
+
+
+def get_expiring_bans(before: datetime, limit: int = 500) -> list[dict]:
+    """Aktive temporäre Banns, die vor `before` ablaufen - früheste zuerst (Partial-Index)."""
+    with pool.read() as conn:
+        rows = conn.execute(
             """
-            INSERT INTO punishments (guild_id, user_id, active_ban, reason)
-            VALUES (?, ?, 1, ?)
-            ON CONFLICT(guild_id, user_id)
-            DO UPDATE SET active_ban = 1, reason = excluded.reason
+            SELECT guild_id, user_id, ban_until
+            FROM punishments
+            WHERE ban_until IS NOT NULL
+              AND ban_until < ?
+              AND active_ban = 1
+            ORDER BY ban_until
+            LIMIT ?
             """,
-            (guild_id, user_id, reason)
-        )
+            (to_ms(before), limit)
+        ).fetchall()
+
+    return [
+        {"guild_id": guild_id, "user_id": user_id, "until": from_ms(until)}
+        for guild_id, user_id, until in rows
+    ]
+
+
+_UPSERT_TIMEOUT_SQL = """
+    INSERT INTO punishments (guild_id, user_id, active_timeout_until, reason)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(guild_id, user_id)
+    DO UPDATE SET active_timeout_until = excluded.active_timeout_until, reason = excluded.reason
+"""
+
+
+def _upsert_timeout(conn, guild_id, user_id, until, reason):
+    conn.execute(_UPSERT_TIMEOUT_SQL, (guild_id, user_id, until, reason))
+
+
+def queue_save_timeout(guild_id: int, user_id: int, until: datetime, reason: str | None = None) -> Future:
+    return writer.submit(_upsert_timeout, guild_id, user_id, to_ms(until), reason)
+
+
+def save_timeout(guild_id: int, user_id: int, until: datetime, reason: str | None = None):
+    queue_save_timeout(guild_id, user_id, until, reason).result()
+
+
+def _upsert_timeouts(conn, guild_id, user_ids, until, reason):
+    conn.executemany(_UPSERT_TIMEOUT_SQL, [(guild_id, uid, until, reason) for uid in user_ids])
+
+
+def queue_save_timeouts(guild_id: int, user_ids, until: datetime, reason: str | None = None) -> Future:
+    """Viele Timeouts in einem Auftrag (Mass-Moderation)."""
+    return writer.submit(_upsert_timeouts, guild_id, list(user_ids), to_ms(until), reason)
+
+
+def save_timeouts(guild_id: int, user_ids, until: datetime, reason: str | None = None):
+    queue_save_timeouts(guild_id, user_ids, until, reason).result()
+
+
+def _reset_timeout(conn, guild_id, user_id):
+    conn.execute(
+        """
+        UPDATE punishments
+        SET active_timeout_until = NULL,
+            reason = NULL
+        WHERE guild_id = ? AND user_id = ?
+        """,
+        (guild_id, user_id)
+    )
+
+
+def queue_clear_timeout(guild_id: int, user_id: int) -> Future:
+    return writer.submit(_reset_timeout, guild_id, user_id)
+
+
+def clear_timeout(guild_id: int, user_id: int):
+    queue_clear_timeout(guild_id, user_id).result()
+
+
+# ban_until = NULL -> permanenter Bann (überschreibt auch einen älteren temporären)
+_UPSERT_BAN_SQL = """
+    INSERT INTO punishments (guild_id, user_id, active_ban, ban_until, reason)
+    VALUES (?, ?, 1, ?, ?)
+    ON CONFLICT(guild_id, user_id)
+    DO UPDATE SET active_ban = 1, ban_until = excluded.ban_until, reason = excluded.reason
+"""
+
+
+def _upsert_ban(conn, guild_id, user_id, until, reason):
+    conn.execute(_UPSERT_BAN_SQL, (guild_id, user_id, until, reason))
+
+
+def queue_save_ban(
+    guild_id: int, user_id: int, reason: str | None = None, until: datetime | None = None
+) -> Future:
+    return writer.submit(_upsert_ban, guild_id, user_id, to_ms(until), reason)
+
+
+def save_ban(guild_id: int, user_id: int, reason: str | None = None, until: datetime | None = None):
+    queue_save_ban(guild_id, user_id, reason, until).result()
+
+
+def _upsert_bans(conn, guild_id, user_ids, reason):
+    conn.executemany(_UPSERT_BAN_SQL, [(guild_id, uid, None, reason) for uid in user_ids])
+
+
+def queue_save_bans(guild_id: int, user_ids, reason: str | None = None) -> Future:
+    """Viele Banns in einem Auftrag (Mass-Moderation)."""
+    return writer.submit(_upsert_bans, guild_id, list(user_ids), reason)
+
+
+def save_bans(guild_id: int, user_ids, reason: str | None = None):
+    queue_save_bans(guild_id, user_ids, reason).result()
+
+
+def _mark_banned(conn, guild_id, user_id, reason):
+    # Bestehender aktiver Bann (mit Grund / Ablauf) bleibt unangetastet
+    conn.execute(
+        """
+        INSERT INTO punishments (guild_id, user_id, active_ban, ban_until, reason)
+        VALUES (?, ?, 1, NULL, ?)
+        ON CONFLICT(guild_id, user_id)
+        DO UPDATE SET active_ban = 1, ban_until = NULL, reason = excluded.reason
+        WHERE active_ban = 0
+        """,
+        (guild_id, user_id, reason)
+    )
+
+
+def queue_mark_banned(guild_id: int, user_id: int, reason: str | None = None) -> Future:
+    """Bann von außen (z.B. on_member_ban) - überschreibt keinen Bann des Bots."""
+    return writer.submit(_mark_banned, guild_id, user_id, reason)
+
+
+def mark_banned(guild_id: int, user_id: int, reason: str | None = None):
+    queue_mark_banned(guild_id, user_id, reason).result()
+
+
+def _reset_ban(conn, guild_id, user_id):
+    conn.execute(
+        """
+        UPDATE punishments
+        SET active_ban = 0, ban_until = NULL, reason = NULL
+        WHERE guild_id = ? AND user_id = ?
+        """,
+        (guild_id, user_id)
+    )
+
+
+def queue_clear_ban(guild_id: int, user_id: int) -> Future:
+    return writer.submit(_reset_ban, guild_id, user_id)
 
 
 def clear_ban(guild_id: int, user_id: int):
-    with get_connection() as conn:
-        conn.execute(
-            """
-            UPDATE punishments
-            SET active_ban = 0, reason = NULL
-            WHERE guild_id = ? AND user_id = ?
-            """,
-            (guild_id, user_id)
-        )
+    queue_clear_ban(guild_id, user_id).result()
 
-def get_user_status(guild_id: int, user_id: int):
-    with get_connection() as conn:
+# ==================================================
+# RETENTION / ARCHIV
+# ==================================================
+
+def _archive_batch(conn, cutoff: int, batch_size: int, archived_at: int) -> int:
+    rows = conn.execute(
+        """
+        SELECT id, guild_id, user_id FROM warnings
+        WHERE created_at < ?
+        ORDER BY created_at
+        LIMIT ?
+        """,
+        (cutoff, batch_size)
+    ).fetchall()
+    if not rows:
+        return 0
+
+    ids = json.dumps([row[0] for row in rows])
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO warnings_archive (
+            id, guild_id, user_id, moderator_id, reason,
+            created_at, auto_action_type, auto_action_at, archived_at
+        )
+        SELECT id, guild_id, user_id, moderator_id, reason,
+               created_at, auto_action_type, auto_action_at, ?
+        FROM warnings
+        WHERE id IN (SELECT value FROM json_each(?))
+        """,
+        (archived_at, ids)
+    )
+    # Trigger halten user_stats dabei aktuell
+    conn.execute("DELETE FROM warnings WHERE id IN (SELECT value FROM json_each(?))", (ids,))
+
+    # Betroffene Zähler nach dem COMMIT verwerfen (nächster Read lädt neu)
+    for key in {(guild_id, user_id) for _, guild_id, user_id in rows}:
+        writer.after_commit(warn_counts.invalidate, key)
+    return len(rows)
+
+
+def archive_old_warnings(max_age_days: int, batch_size: int = 500, vacuum_pages: int = 200) -> int:
+    """
+    Verschiebt Verwarnungen älter als max_age_days nach warnings_archive.
+    Arbeitet in Batches (je eine Transaktion über den Writer) und gibt
+    zwischen den Batches freie Seiten per incremental_vacuum zurück.
+    Rückgabe: Anzahl archivierter Verwarnungen
+    """
+    if max_age_days <= 0:
+        return 0
+
+    cutoff = to_ms(datetime.now(timezone.utc) - timedelta(days=max_age_days))
+    total = 0
+    while True:
+        moved = writer.submit(
+            _archive_batch, cutoff, batch_size, now_ms()
+        ).result()
+        total += moved
+        if moved:
+            pool.incremental_vacuum(vacuum_pages)
+        if moved < batch_size:
+            return total
+
+
+def count_archived_warnings(guild_id: int, user_id: int) -> int:
+    with pool.read() as conn:
         cur = conn.execute(
-            """
-            SELECT
-                (SELECT COUNT(*) FROM warnings
-                 WHERE guild_id = ? AND user_id = ?) AS warn_count,
-                active_timeout_until,
-                active_ban,
-                reason
-            FROM punishments
-            WHERE guild_id = ? AND user_id = ?
-            """,
-            (guild_id, user_id, guild_id, user_id)
+            "SELECT COUNT(*) FROM warnings_archive WHERE guild_id = ? AND user_id = ?",
+            (guild_id, user_id)
         )
-        row = cur.fetchone()
+        return cur.fetchone()[0]
 
-    if not row:
-        return {
-            "warns": 0,
-            "timeout_until": None,
-            "active_ban": False,
-            "reason": None,
-        }
 
-    warns, timeout_until, active_ban, reason = row
+# ==================================================
+# SNAPSHOT (alles zu einem User in einer Query)
+# ==================================================
+
+# Ziel-User kommen als JSON-Array rein -> eine Query für 1 oder 1000 IDs,
+# ohne das SQLite-Limit für Parameter anzufassen.
+_SNAPSHOT_SQL = """
+WITH targets(user_id) AS (
+    SELECT DISTINCT value FROM json_each(:user_ids)
+)
+SELECT
+    t.user_id,
+    COALESCE(s.warn_count, 0),
+    s.last_warn_id,
+    s.last_auto_action_type,
+    s.last_auto_action_at,
+    p.active_timeout_until,
+    p.active_ban,
+    p.reason
+FROM targets t
+LEFT JOIN user_stats s
+    ON s.guild_id = :guild_id AND s.user_id = t.user_id
+LEFT JOIN punishments p
+    ON p.guild_id = :guild_id AND p.user_id = t.user_id
+"""
+
+
+def _snapshot_from_row(row) -> dict:
+    _, warns, last_warn_id, action_type, action_at, timeout_until, active_ban, reason = row
     return {
         "warns": warns,
-        "timeout_until": (
-            datetime.fromisoformat(timeout_until)
-            if timeout_until else None
+        "last_warning_id": last_warn_id,
+        "last_auto_action": (
+            {"type": action_type, "at": from_ms(action_at)}
+            if action_at is not None else None
         ),
+        "timeout_until": from_ms(timeout_until),
         "active_ban": bool(active_ban),
         "reason": reason,
     }
+
+
+def get_user_snapshots(guild_id: int, user_ids) -> dict[int, dict]:
+    """
+    Moderations-Status für viele User in EINEM Statement (Dashboard, Bulk-Tools).
+    Rückgabe: {user_id: snapshot} - auch für User ohne Einträge.
+    """
+    user_ids = [int(uid) for uid in user_ids]
+    if not user_ids:
+        return {}
+
+    token = warn_counts.begin_load()
+    with pool.read() as conn:
+        rows = conn.execute(
+            _SNAPSHOT_SQL,
+            {"guild_id": guild_id, "user_ids": json.dumps(user_ids)}
+        ).fetchall()
+
+    snapshots = {}
+    for row in rows:
+        snapshots[row[0]] = _snapshot_from_row(row)
+        warn_counts.store((guild_id, row[0]), row[1], token)
+    return snapshots
+
+
+def get_user_snapshot(guild_id: int, user_id: int) -> dict:
+    """
+    Warn-Anzahl, letzte Warn-ID, letzte Auto-Aktion, Timeout, Bann und Grund
+    in einer Query (statt get_user_status + count_warnings + get_last_auto_action).
+    """
+    return get_user_snapshots(guild_id, [user_id])[user_id]
+
+
+def get_user_status(guild_id: int, user_id: int):
+    snapshot = get_user_snapshot(guild_id, user_id)
+    return {
+        "warns": snapshot["warns"],
+        "timeout_until": snapshot["timeout_until"],
+        "active_ban": snapshot["active_ban"],
+        "reason": snapshot["reason"],
+    }
+
+
+# ==================================================
+# BULK IMPORT / EXPORT (Streaming)
+# ==================================================
+
+# Spalten in Export-Reihenfolge; der erste Block ist der Sortier-Schlüssel
+EXPORT_TABLES = {
+    "warnings": (
+        ("id",),
+        ("id", "guild_id", "user_id", "moderator_id", "reason",
+         "created_at", "auto_action_type", "auto_action_at"),
+    ),
+    "punishments": (
+        ("guild_id", "user_id"),
+        ("guild_id", "user_id", "active_timeout_until", "active_ban", "ban_until", "reason"),
+    ),
+}
+
+INTEGER_COLUMNS = {"id", "guild_id", "user_id", "moderator_id", "active_ban"}
+# In der DB ms seit Epoch, in Export-Dateien ISO 8601 (UTC) - lesbar und versionsunabhängig
+TIMESTAMP_COLUMNS = {"created_at", "auto_action_at", "active_timeout_until", "ban_until"}
+
+
+def _table_spec(table: str):
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unbekannte Tabelle: {table}")
+    return EXPORT_TABLES[table]
+
+
+def iter_table(table: str, *, guild_id: int | None = None, chunk_size: int = 1000):
+    """
+    Liefert alle Zeilen einer Tabelle als dicts - Chunk für Chunk per Keyset
+    (WHERE key > letzter Key), damit weder der Speicher wächst noch eine
+    Lese-Transaktion die ganze Zeit offen bleibt.
+    """
+    key_cols, columns = _table_spec(table)
+    select = f"SELECT {', '.join(columns)} FROM {table}"
+    order = f"ORDER BY {', '.join(key_cols)} LIMIT ?"
+    key_pos = [columns.index(col) for col in key_cols]
+
+    last_key = None
+    while True:
+        where, params = [], []
+        if guild_id is not None:
+            where.append("guild_id = ?")
+            params.append(guild_id)
+        if last_key is not None:
+            # Row-Value-Vergleich: (a, b) > (?, ?)
+            where.append(f"({', '.join(key_cols)}) > ({', '.join('?' * len(key_cols))})")
+            params.extend(last_key)
+
+        sql = select
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " " + order
+
+        with pool.read() as conn:
+            rows = conn.execute(sql, (*params, chunk_size)).fetchall()
+
+        for row in rows:
+            item = dict(zip(columns, row))
+            for col in TIMESTAMP_COLUMNS.intersection(item):
+                item[col] = ms_to_iso(item[col])
+            yield item
+
+        if len(rows) < chunk_size:
+            return
+        last_key = tuple(rows[-1][pos] for pos in key_pos)
+
+
+def _normalize_row(columns, row: dict) -> tuple:
+    values = []
+    for col in columns:
+        value = row.get(col)
+        if value == "":
+            value = None  # CSV kennt kein NULL
+        if value is not None and col in INTEGER_COLUMNS:
+            value = int(value)
+        elif col in TIMESTAMP_COLUMNS:
+            value = iso_to_ms(value)
+        values.append(value)
+    return tuple(values)
+
+
+def _import_chunk(conn, table: str, columns, rows: list) -> int:
+    placeholders = ", ".join("?" * len(columns))
+    if table == "punishments":
+        updates = ", ".join(f"{col} = excluded.{col}" for col in columns if col not in ("guild_id", "user_id"))
+        sql = (
+            f"INSERT INTO punishments ({', '.join(columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(guild_id, user_id) DO UPDATE SET {updates}"
+        )
+    else:
+        # Bereits vorhandene IDs (nur mit keep_ids möglich) werden übersprungen
+        sql = f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+    # rowcount zählt nur diese Tabelle (nicht die user_stats-Trigger)
+    return conn.executemany(sql, rows).rowcount
+
+
+def import_table(
+    table: str,
+    rows,
+    *,
+    chunk_size: int = 1000,
+    keep_ids: bool = False,
+    progress=None,
+) -> int:
+    """
+    Schreibt Zeilen (beliebiges Iterable von dicts, z.B. ein Generator) per
+    executemany in Chunks - eine Transaktion pro Chunk über den Writer.
+    keep_ids=False: Warn-IDs werden neu vergeben (sicher beim Zusammenführen).
+    progress(anzahl_gelesen, anzahl_geschrieben) wird nach jedem Chunk aufgerufen.
+    Rückgabe: Anzahl geschriebener Zeilen
+    """
+    _, columns = _table_spec(table)
+    if table == "warnings" and not keep_ids:
+        columns = tuple(col for col in columns if col != "id")
+
+    read = written = 0
+    chunk = []
+
+    def flush():
+        nonlocal written
+        written += writer.submit(_import_chunk, table, columns, chunk).result()
+        if progress:
+            progress(read, written)
+
+    for row in rows:
+        chunk.append(_normalize_row(columns, row))
+        read += 1
+        if len(chunk) >= chunk_size:
+            flush()
+            chunk = []
+    if chunk:
+        flush()
+
+    # Zähler der importierten User sind jetzt unbekannt -> beim nächsten Lesen neu laden
+    if table == "warnings" and written:
+        warn_counts.clear()
+    return written